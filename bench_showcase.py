@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_showcase.py
+Benchmarks the showcase build and the generated page as the data grows.
+
+Synthetic rosters (from the same placeholder projects `--seed` creates) and
+synthetic Tinkercad dumps are generated in a scratch directory, then:
+  - build_json_from_rosters(): cold, warm (nothing changed) and --jobs 4
+  - parse_kappa_dump.main(): one dump of N projects
+  - the page's applyFilter()/renderGrid() under Node with a tiny DOM stand-in
+Wall time, rows/second and peak Python memory (tracemalloc) are written to a
+JSON report so runs can be compared between commits.
+
+USAGE:
+  python bench_showcase.py                          # 1k / 10k / 100k projects
+  python bench_showcase.py --sizes 1000,5000        # custom sizes
+  python bench_showcase.py --out new.json --compare old.json
+Requires: Python 3.8+; Node.js (optional) for the page timings.
+"""
+
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+DEFAULT_SIZES = [1000, 10000, 100000]
+DEFAULT_OUT = Path("bench_report.json")
+PAGE_REPEATS = 5
+
+# ---------- Page harness (Node) ----------
+# A minimal DOM stand-in: just enough for the generated page script to run,
+# so filter/sort/render cost can be timed without a headless browser.
+PAGE_HARNESS_JS = r"""
+const fs = require('fs'), path = require('path');
+const { performance } = require('perf_hooks');
+const [root, pageFile, repeats] = process.argv.slice(2);
+global.REPEATS = Number(repeats);
+function el() {
+  return {
+    innerHTML: '', textContent: '', value: '', style: {}, dataset: {}, children: [], attrs: {}, listeners: {}, _q: {},
+    classList: { s: new Set(), add(c) { this.s.add(c) }, remove(c) { this.s.delete(c) },
+      toggle(c, f) { (f === undefined ? !this.s.has(c) : f) ? this.s.add(c) : this.s.delete(c) }, contains(c) { return this.s.has(c) } },
+    addEventListener(t, f) { (this.listeners[t] = this.listeners[t] || []).push(f) }, removeEventListener() {},
+    appendChild(c) { this.children.push(c); c.parentNode = this; return c },
+    insertBefore(c) { return this.appendChild(c) },
+    removeChild(c) { this.children = this.children.filter(x => x !== c); c.parentNode = null; return c },
+    replaceChild(n, o) { const i = this.children.indexOf(o); if (i >= 0) this.children[i] = n; return o },
+    remove() { if (this.parentNode) this.parentNode.removeChild(this) },
+    get firstElementChild() { if (!this.children.length) this.appendChild(el()); return this.children[0] },
+    setAttribute(k, v) { this.attrs[k] = String(v) }, getAttribute(k) { return k in this.attrs ? this.attrs[k] : null },
+    querySelector(sel) { return this._q[sel] || (this._q[sel] = el()) }, querySelectorAll() { return [] },
+    closest() { return null }, getBoundingClientRect() { return { top: 0, left: 0, width: 1200, height: 800 } },
+    clientWidth: 1200, offsetHeight: 280,
+  };
+}
+const byId = {};
+global.document = {
+  getElementById: id => byId[id] || (byId[id] = el()),
+  createElement: tag => { const e = el(); if (tag === 'template') e.content = { get firstElementChild() { return el() } }; return e },
+  addEventListener() {}, querySelectorAll() { return [] }, querySelector() { return null },
+  body: el(), head: el(), documentElement: el(),
+};
+global.window = global;
+global.navigator = {};
+global.location = { search: '', pathname: '/index.html', href: 'http://localhost/index.html', replace() {} };
+global.innerHeight = 800; global.scrollY = 0;
+global.addEventListener = () => {};
+global.getComputedStyle = () => ({ paddingLeft: '22px', paddingRight: '22px' });
+global.requestAnimationFrame = f => setTimeout(f, 0);
+global.fetch = async url => {
+  const file = path.join(root, url.split('?')[0]);
+  if (!fs.existsSync(file)) return { ok: false, status: 404, json: async () => { throw new Error('404 ' + url) } };
+  const body = fs.readFileSync(file, 'utf8');
+  return { ok: true, status: 200, json: async () => JSON.parse(body), text: async () => body };
+};
+global.t0 = performance.now();
+(0, eval)(fs.readFileSync(pageFile, 'utf8') + `
+;(async () => {
+  const ready = () => ALL.length > 0 && SEARCH && countText.textContent && countText.textContent !== 'Loading…';
+  while (!ready()) await new Promise(r => setTimeout(r, 1));
+  const out = { init_ms: performance.now() - t0, projects: ALL.length };
+  const grade = GRADES[1] || 'All';
+  const ops = {
+    'filter-all': () => { filterGrade = 'All'; filterClass = '__ALL__'; searchBox.value = ''; applyFilter(); },
+    'filter-grade': () => { filterGrade = grade; applyFilter(); },
+    'search-prefix': () => { filterGrade = 'All'; searchBox.value = 'proj'; applyFilter(); },
+    'search-narrow': () => { searchBox.value = 'student 1'; applyFilter(); },
+    'sort-date-asc': () => { searchBox.value = ''; sortSelect.value = 'date-asc'; applyFilter(); },
+    'sort-title': () => { sortSelect.value = 'title-asc'; applyFilter(); },
+    'sort-student': () => { sortSelect.value = 'student-asc'; applyFilter(); },
+    'render-grid': () => renderGrid(),
+  };
+  sortSelect.value = 'date-desc';
+  for (const [name, fn] of Object.entries(ops)) {
+    const times = [];
+    for (let r = 0; r < REPEATS; r++) { const s = performance.now(); fn(); times.push(performance.now() - s); }
+    times.sort((a, b) => a - b);
+    out[name + '_ms'] = times[Math.floor(times.length / 2)];
+  }
+  console.log(JSON.stringify(out));
+})();
+`);
+"""
+
+# ---------- Synthetic data ----------
+def make_rosters(ss, n: int):
+    """Writes about n placeholder projects spread over one roster per class."""
+    shutil.rmtree(ss.ROOT, ignore_errors=True)
+    ss.ensure_dirs()
+    classes = [{"name": c["name"], "grade": ss.derive_grade_label(c["name"])} for c in ss.RAW_CLASSES]
+    per_class = -(-n // len(classes))
+    projects = ss.placeholder_projects(classes, per_class)[:n]
+    by_class = {}
+    for p in projects:
+        by_class.setdefault(p["klass"], []).append(p)
+    for klass, rows in by_class.items():
+        with (ss.ROSTERS_DIR / f"{ss.normalize_id(klass)}.csv").open("w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(ss.ROSTER_HEADERS)
+            for p in rows:
+                w.writerow([p["id"], p["title"], p["student"], p["klass"], p["grade"], p["thumbnail"],
+                            p["embedUrl"], ";".join(p["tags"]), p["date"]])
+
+def make_dump(path: Path, n: int):
+    """Writes a Tinkercad-page-like dump with n designs, UI noise and repeats."""
+    with path.open("w", encoding="utf-8") as f:
+        for i in range(n):
+            f.write(f"Design {i} treehouse\nKappa_{i % 1000:03d}\nTinker this\nPrivate\n\n")
+            if i % 10 == 0:  # cards repeat on the page
+                f.write(f"Design {i} treehouse\nKappa_{i % 1000:03d}\n")
+
+# ---------- Measurement ----------
+def measure(setup, fn, rows: int) -> dict:
+    """Times fn() and, in a second run, records its peak traced memory."""
+    quiet = io.StringIO()
+    setup()
+    with contextlib.redirect_stdout(quiet):
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+    setup()
+    tracemalloc.start()
+    with contextlib.redirect_stdout(quiet):
+        fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "seconds": round(seconds, 4),
+        "rows_per_sec": round(rows / seconds) if seconds else None,
+        "peak_mb": round(peak / 2**20, 2)
+    }
+
+def bench_page(ss, repeats: int) -> dict:
+    node = shutil.which("node")
+    if not node:
+        return {"skipped": "node not found"}
+    # the shared data module first, as the page's <script src> would load it
+    scripts = [ss.CLIENT_DATA_JS] + re.findall(r"<script>(.*?)</script>", ss.INDEX_HTML, re.S)
+    page_js = Path("page.js")
+    harness_js = Path("harness.js")
+    page_js.write_text("\n".join(scripts), encoding="utf-8")
+    harness_js.write_text(PAGE_HARNESS_JS, encoding="utf-8")
+    res = subprocess.run([node, str(harness_js), str(ss.ROOT), str(page_js), str(repeats)],
+                         capture_output=True, text=True, timeout=600)
+    if res.returncode != 0:
+        return {"error": res.stderr.strip().splitlines()[-1:]}
+    return {k: round(v, 3) if isinstance(v, float) else v for k, v in json.loads(res.stdout).items()}
+
+def bench_size(ss, pk, n: int) -> dict:
+    result = {}
+
+    def cold():
+        for p in (ss.MANIFEST_PATH, ss.PROJECTS_JSON_PATH):
+            if p.exists():
+                p.unlink()
+
+    make_rosters(ss, n)
+    result["build_cold"] = measure(cold, ss.build_json_from_rosters, n)
+    result["build_warm"] = measure(lambda: None, ss.build_json_from_rosters, n)
+    result["build_jobs4"] = measure(cold, lambda: ss.build_json_from_rosters(jobs=4), n)
+
+    dump = Path("raw_bench.txt")
+    make_dump(dump, n)
+    out_csv = Path("bench_roster.csv")
+    result["dump_parse"] = measure(lambda: None, lambda: pk.main([str(dump), "-o", str(out_csv)]), n)
+    result["dump_parse"]["input_mb"] = round(dump.stat().st_size / 2**20, 2)
+
+    cold()
+    with contextlib.redirect_stdout(io.StringIO()):
+        ss.build_json_from_rosters()
+    result["page"] = bench_page(ss, PAGE_REPEATS)
+    return result
+
+# ---------- Report ----------
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def flatten(report: dict) -> dict:
+    flat = {}
+    for size, stages in report["sizes"].items():
+        for stage, metrics in stages.items():
+            for key, value in metrics.items():
+                if isinstance(value, (int, float)):
+                    flat[f"{size}/{stage}/{key}"] = value
+    return flat
+
+def compare(new: dict, old: dict):
+    """Prints every shared metric with its change from the old report."""
+    a, b = flatten(old), flatten(new)
+    print(f"[COMPARE] {old.get('commit')} -> {new.get('commit')}")
+    for key in sorted(a.keys() & b.keys(), key=lambda k: (int(k.split('/')[0]), k)):
+        if a[key]:
+            print(f"  {key:<45} {a[key]:>12} -> {b[key]:>12}  ({(b[key] - a[key]) / a[key]:+.1%})")
+
+# ---------- CLI ----------
+def main():
+    sizes = DEFAULT_SIZES
+    out = DEFAULT_OUT
+    baseline = None
+    args = sys.argv[1:]
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a == "--sizes":
+            i += 1
+            sizes = [int(x) for x in args[i].split(",")]
+        elif a in ("--out", "-o"):
+            i += 1
+            out = Path(args[i])
+        elif a == "--compare":
+            i += 1
+            baseline = Path(args[i])
+        else:
+            print(f"Unknown arg: {a}")
+        i += 1
+    out = out.resolve()
+    baseline = baseline.resolve() if baseline else None
+
+    report = {
+        "commit": git_commit(),
+        "date": str(date.today()),
+        "python": platform.python_version(),
+        "sizes": {}
+    }
+    cwd = Path.cwd()
+    with tempfile.TemporaryDirectory(prefix="showcase-bench-") as tmp:
+        # setup_showcase resolves its paths from the working directory at import
+        os.chdir(tmp)
+        sys.path.insert(0, str(HERE))
+        try:
+            import setup_showcase as ss
+            import parse_kappa_dump as pk
+            for n in sizes:
+                print(f"[BENCH] {n} projects…")
+                report["sizes"][str(n)] = bench_size(ss, pk, n)
+                for stage, metrics in report["sizes"][str(n)].items():
+                    print(f"  {stage:<12} {metrics}")
+        finally:
+            os.chdir(cwd)
+
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"[OK] Wrote {out}")
+    if baseline:
+        compare(report, json.loads(baseline.read_text(encoding="utf-8")))
+
+if __name__ == "__main__":
+    main()
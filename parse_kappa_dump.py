@@ -1,21 +1,54 @@
 #!/usr/bin/env python3
 # parse_kappa_dump.py
 # Parse a raw Tinkercad class page dump into a roster CSV for the showcase.
+#
+# USAGE:
+#   python parse_kappa_dump.py                     # reads raw_kappa.txt
+#   python parse_kappa_dump.py dump.txt -o out.csv # explicit input/output
+#   cat dump.txt | python parse_kappa_dump.py -    # read the dump from stdin
+#   python parse_kappa_dump.py --batch dumps/ -j 4 # one CSV per class dump
+#   python parse_kappa_dump.py dump.txt --profile  # time, rows/s and peak memory
+#   python parse_kappa_dump.py dump.txt --profile-out parse.prof  # ...plus a cProfile dump
+#   python parse_kappa_dump.py dump.txt --tag-stats  # print how many titles got each tag
+#   python parse_kappa_dump.py dump.txt --taxonomy tags.json  # keywords -> tags file to use
+#
+# In batch mode every file in the directory is matched to a class in
+# setup_showcase.RAW_CLASSES by name: either the class id ("rm225-g3-kappa.txt")
+# or its username prefix ("raw_kappa.txt"). Each class gets its own username
+# pattern (Kappa_###, Iota_###, ...) and roster CSV, and dumps are parsed
+# concurrently.
+#
+# Tags come from title keywords in showcase/data/tag-taxonomy.json (the same
+# matcher as `setup_showcase.py --build-json --auto-tag`).
+#
+# The dump is streamed line by line and rows are written as they are found,
+# so memory stays flat regardless of the size of the page export.
 
 import re, csv, sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import date
 
+from setup_showcase import (PROFILE, RAW_CLASSES, TagMatcher, atomic_writer, derive_grade_label,
+                            derive_user_prefix, load_tag_taxonomy)
+
 RAW_FILE = Path("raw_kappa.txt")
 OUT_DIR = Path("showcase/rosters")
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 OUT_CSV = OUT_DIR / "rm225-g3-kappa.csv"
 
+# How many recent (title, user) keys to remember for de-duplication.
+# Tinkercad repeats a card within the same page section, so a bounded window
+# catches the duplicates without holding every key of a huge dump.
+DEDUPE_WINDOW = 100_000
+
 KLASS = "RM225 - G3 - Kappa"
 GRADE = "Grade 3"
 
 # Heuristics: a username line looks like Kappa_###; the title is usually on the line just above it.
 USER_RE = re.compile(r"^Kappa_\d{3}$", re.I)
+USER_RE_TEMPLATE = r"^{prefix}_\d{{3}}$"
 NO_TITLE = set([
     "Private","Edited","React","View in 3D","Upload Image","Tinker this","Download",
     "Share class link","Students","Activities","Designs","Moderation","Co-teachers",
@@ -30,55 +63,227 @@ def normalize_id(*parts):
     s = re.sub(r"[^a-z0-9]+", "-", s)
     return s.strip("-")
 
-def main():
-    if not RAW_FILE.exists():
-        sys.exit(f"Missing {RAW_FILE}. Put your pasted class text there.")
+HEADERS = ["id","title","student","klass","grade","thumbnail","embedUrl","tags","date"]
+
+def read_lines(src):
+    """Yields stripped lines from an open text stream, one at a time."""
+    for ln in src:
+        yield ln.strip()
+
+def class_spec(c):
+    """Builds the per-class parse settings for a RAW_CLASSES entry."""
+    prefix = c.get("user_prefix") or derive_user_prefix(c["name"])
+    return {
+        "klass": c["name"],
+        "grade": derive_grade_label(c["name"]),
+        "slug": normalize_id(c["name"]),
+        "prefix": prefix,
+        "user_re": re.compile(USER_RE_TEMPLATE.format(prefix=re.escape(prefix)), re.I),
+    }
+
+DEFAULT_SPEC = {
+    "klass": KLASS,
+    "grade": GRADE,
+    "slug": "rm225-g3-kappa",
+    "prefix": "Kappa",
+    "user_re": USER_RE,
+}
 
-    lines = [ln.strip() for ln in RAW_FILE.read_text(encoding="utf-8").splitlines()]
-    pairs = []
+def spec_for_dump(path, specs):
+    """Returns the class spec a dump file belongs to, or None."""
+    stem = normalize_id(path.stem)
+    for spec in specs:
+        if stem in (spec["slug"], normalize_id("raw", spec["prefix"]), normalize_id(spec["prefix"])):
+            return spec
+    return None
+
+def extract_pairs(lines, user_re=USER_RE):
+    """Yields (title, user) pairs, keeping only the previous non-empty line."""
     prev = ""
     for ln in lines:
-        if USER_RE.match(ln):
-            user = ln
-            title = prev.strip()
-            if title and title not in NO_TITLE and not USER_RE.match(title):
-                pairs.append((title, user))
+        if user_re.match(ln):
+            title = prev
+            if title and title not in NO_TITLE and not user_re.match(title):
+                yield title, ln
         if ln:
             prev = ln
 
-    # Deduplicate in order
-    seen = set()
-    unique = []
-    for title, user in pairs:
-        key = (title, user)
-        if key not in seen:
-            seen.add(key)
-            unique.append((title, user))
-
-    headers = ["id","title","student","klass","grade","thumbnail","embedUrl","tags","date"]
-    with OUT_CSV.open("w", newline="", encoding="utf-8") as f:
+def dedupe(pairs, window=DEDUPE_WINDOW):
+    """Drops repeated pairs in order, remembering at most `window` recent keys."""
+    seen = OrderedDict()
+    for key in pairs:
+        if key in seen:
+            seen.move_to_end(key)
+            continue
+        seen[key] = None
+        if len(seen) > window:
+            seen.popitem(last=False)
+        yield key
+
+def project_row(title, user, today, spec, matcher):
+    student_priv = user  # Replace later with "First L."
+    pid = normalize_id(spec["slug"], user, title[:40])
+    tags = matcher.tags(title)
+    return [
+        pid,
+        title,
+        student_priv,
+        spec["klass"],
+        spec["grade"],
+        "",  # thumbnail (optional)
+        "",  # embedUrl (fill after you or students make public)
+        ";".join(tags),
+        today
+    ]
+
+def write_roster(src, out_csv, window=DEDUPE_WINDOW, spec=DEFAULT_SPEC, matcher=None):
+    """
+    Streams a dump from `src` into `out_csv`, which is replaced atomically
+    once complete. Returns the number of rows written.
+    """
+    matcher = matcher or TagMatcher(load_tag_taxonomy())
+    today = str(date.today())
+    n = 0
+    with atomic_writer(out_csv) as f:
         w = csv.writer(f)
-        w.writerow(headers)
-        for title, user in unique:
-            student_priv = user  # Replace later with "First L."
-            pid = normalize_id("rm225-g3-kappa", user, title[:40])
-            tags = []
-            if re.search(r"tree|house", title, re.I): tags.append("treehouse")
-            if re.search(r"rocket|mars", title, re.I): tags.append("space")
-            if re.search(r"circuit|wire|simulate|components", title, re.I): tags.append("circuits")
-            w.writerow([
-                pid,
-                title,
-                student_priv,
-                KLASS,
-                GRADE,
-                "",  # thumbnail (optional)
-                "",  # embedUrl (fill after you or students make public)
-                ";".join(tags),
-                str(date.today())
-            ])
-
-    print(f"[OK] Wrote {OUT_CSV} with {len(unique)} rows.")
+        w.writerow(HEADERS)
+        for title, user in dedupe(extract_pairs(read_lines(src), spec["user_re"]), window):
+            w.writerow(project_row(title, user, today, spec, matcher))
+            n += 1
+    return n
+
+# The compiled TagMatcher in a batch worker process (set by init_worker).
+WORKER_MATCHER = None
+
+def init_worker(matcher):
+    """Pool initializer: the matcher arrives compiled, once per worker process."""
+    global WORKER_MATCHER
+    WORKER_MATCHER = matcher
+
+def parse_dump(raw_file, out_csv, window, spec):
+    """Worker: parses one dump, returning (rows, tag hits or None, titles) for it."""
+    matcher = WORKER_MATCHER
+    if matcher.counts is not None:
+        matcher.counts.clear()
+    matcher.titles = 0
+    with raw_file.open(encoding="utf-8") as src:
+        n = write_roster(src, out_csv, window, spec, matcher)
+    return n, matcher.counts, matcher.titles
+
+def run_batch(raw_dir, out_dir, window=DEDUPE_WINDOW, jobs=None, matcher=None):
+    """
+    Parses every class dump in `raw_dir` concurrently into `out_dir`/<class>.csv.
+    Returns the total number of rows written. Every worker gets a copy of the
+    compiled `matcher` when it starts; tag hits are merged back into it.
+    """
+    matcher = matcher or TagMatcher(load_tag_taxonomy())
+    count = matcher.counts is not None
+    specs = [class_spec(c) for c in RAW_CLASSES]
+    tasks = []
+    for raw_file in sorted(p for p in raw_dir.iterdir() if p.is_file()):
+        spec = spec_for_dump(raw_file, specs)
+        if spec is None:
+            print(f"[WARN] {raw_file.name}: no class in RAW_CLASSES matches this file name, skipped.")
+            continue
+        tasks.append((raw_file, out_dir / f"{spec['slug']}.csv", spec))
+    if not tasks:
+        sys.exit(f"No class dumps found in {raw_dir}.")
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    total = 0
+    with ProcessPoolExecutor(max_workers=jobs, initializer=init_worker, initargs=(matcher,)) as pool:
+        futures = [pool.submit(parse_dump, raw_file, out_csv, window, spec) for raw_file, out_csv, spec in tasks]
+        for (raw_file, out_csv, spec), fut in zip(tasks, futures):
+            n, counts, titles = fut.result()
+            total += n
+            if count:
+                matcher.counts.update(counts)
+                matcher.titles += titles
+            if n:
+                print(f"[OK] {raw_file.name} -> {out_csv} ({spec['klass']}, {spec['prefix']}_###): {n} rows.")
+            else:
+                print(f"[WARN] {raw_file.name} -> {out_csv}: no {spec['prefix']}_### usernames found, roster is empty. "
+                      f"Set \"user_prefix\" for {spec['klass']!r} in RAW_CLASSES if students use another prefix.")
+    return total
+
+def main(argv=None):
+    raw_file = RAW_FILE
+    out_path = None
+    window = DEDUPE_WINDOW
+    batch_dir = None
+    jobs = None
+    profile = False
+    profile_out = None
+    taxonomy_path = None
+    tag_stats = False
+    args = sys.argv[1:] if argv is None else argv
+    i = 0
+    while i < len(args):
+        a = args[i]
+        if a in ("--out", "-o"):
+            i += 1
+            out_path = Path(args[i])
+        elif a == "--window":
+            i += 1
+            window = int(args[i])
+        elif a == "--batch":
+            i += 1
+            batch_dir = Path(args[i])
+        elif a in ("--jobs", "-j"):
+            i += 1
+            jobs = int(args[i])
+        elif a == "--profile":
+            profile = True
+        elif a == "--profile-out":
+            i += 1
+            profile = True
+            profile_out = Path(args[i])
+        elif a == "--taxonomy":
+            i += 1
+            taxonomy_path = Path(args[i])
+        elif a == "--tag-stats":
+            tag_stats = True
+        elif a == "-" or not a.startswith("-"):
+            raw_file = a
+        else:
+            print(f"Unknown arg: {a}")
+        i += 1
+
+    if profile:
+        PROFILE.start(profile_out)
+    if taxonomy_path is not None and not taxonomy_path.exists():
+        sys.exit(f"Missing {taxonomy_path}.")
+    # compiled once here; every row reuses it, and batch workers get a pickled copy
+    matcher = TagMatcher(load_tag_taxonomy(taxonomy_path), count=tag_stats)
+
+    if batch_dir is not None:
+        # -o names the output directory in batch mode
+        with PROFILE.stage("parse dumps (batch)") as info:
+            info["rows"] = run_batch(batch_dir, out_path or OUT_DIR, window, jobs, matcher)
+        if tag_stats:
+            matcher.report()
+        PROFILE.report()
+        print("Next: paste each student's Tinkercad *Embed* URL into the embedUrl columns,")
+        print("then run:  python setup_showcase.py --build-json")
+        return
+
+    out_csv = out_path or OUT_CSV
+    # read, match, de-duplicate and write are one streaming pass
+    with PROFILE.stage("parse + write roster") as info:
+        if raw_file == "-":
+            n = write_roster(sys.stdin, out_csv, window, DEFAULT_SPEC, matcher)
+        else:
+            raw_file = Path(raw_file)
+            if not raw_file.exists():
+                sys.exit(f"Missing {raw_file}. Put your pasted class text there.")
+            with raw_file.open(encoding="utf-8") as src:
+                n = write_roster(src, out_csv, window, DEFAULT_SPEC, matcher)
+        info["rows"] = n
+
+    print(f"[OK] Wrote {out_csv} with {n} rows.")
+    if tag_stats:
+        matcher.report()
+    PROFILE.report()
     print("Next: Open the CSV, paste each student's Tinkercad *Embed* URL into the embedUrl column.")
     print("Then run:  python setup_showcase.py --build-json")
 
@@ -8,23 +8,72 @@ plus class roster CSV templates you can fill to generate projects.json.
 USAGE:
   python setup_showcase.py                # creates showcase structure and empty templates
   python setup_showcase.py --seed 2       # also seeds 2 placeholder projects per class
-  python setup_showcase.py --build-json   # build projects.json from rosters/*.csv
-Requires: Python 3.8+
+  python setup_showcase.py --build-json   # build projects.json (+ hashed copies and version.json) from rosters/*.csv
+  python setup_showcase.py --build-json --stats   # ...and report rosters skipped vs. rebuilt
+  python setup_showcase.py --build-json --jobs 8  # parse changed rosters in 8 worker processes
+  python setup_showcase.py --build-json --shard class   # also write projects.index.json + shards/
+  python setup_showcase.py --build-json --thumbnails    # resize images/ into cached AVIF/WebP/JPEG thumbs
+  python setup_showcase.py --build-json --compact       # also write a dictionary-encoded, column-wise payload
+  python setup_showcase.py --build-json --merge-duplicates  # keep one copy of a project listed in several rosters
+  python setup_showcase.py --build-json --check-embeds  # verify every embed URL (cached for 7 days in data/embed-cache.json)
+  python setup_showcase.py --build-json --check-embeds --embed-base http://127.0.0.1:9000  # ...against a local stand-in (requests /<host>/<path>)
+  python setup_showcase.py --build-json --strict        # fail if any row breaks the schema (see data/build-report.json)
+  python setup_showcase.py --build-json --prerender     # also write static grade/*.html and class/*.html pages
+  python setup_showcase.py --build-json --auto-tag [--tag-stats]  # add tags from data/tag-taxonomy.json keywords in titles
+  python setup_showcase.py --build-json --store         # also upsert changed rows into the SQLite store (data/showcase.db)
+  python setup_showcase.py --query per-grade --month this  # report from the store: per-grade, per-class, per-tag, missing-embeds, list
+  python setup_showcase.py --query list --grade "Grade 3" --tag robotics  # filters: --grade --class --tag --month --since
+  python setup_showcase.py --sql "SELECT klass, COUNT(*) FROM projects GROUP BY klass"  # ad-hoc read-only SQL
+  python setup_showcase.py --export [--shard grade] [--compact]  # write projects.json/shards/version.json from the store
+  python setup_showcase.py --serve --watch [--port 8000] # dev server; rebuilds on roster/image edits and live-reloads pages
+  python setup_showcase.py --build-json --profile [--profile-out build.prof]  # per-stage time, rows/s, peak memory (+ cProfile dump)
+  python setup_showcase.py --release      # build, then write a minified, fingerprinted, precompressed bundle to dist/
+Requires: Python 3.8+ (Pillow for --thumbnails, brotli for .br files in --release)
 """
 
+import asyncio
+import cProfile
 import csv
+import gzip
+import hashlib
 import json
 import os
+import pstats
 import re
+import shutil
+import sqlite3
 import sys
+import threading
+import time
+import tempfile
+import tracemalloc
+import zlib
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import closing, contextmanager
 from datetime import date
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from textwrap import dedent
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit, urlunsplit
+from urllib.request import Request, urlopen
+
+try:
+    from PIL import Image  # optional: only needed for --thumbnails
+except ImportError:
+    Image = None
+
+try:
+    import brotli  # optional: only needed for .br files in --release
+except ImportError:
+    brotli = None
 
 # ---------- CONFIG: Your classes (from your message) ----------
 RAW_CLASSES = [
-    {"name": "Gonzalez-ULTIMATE", "count": 150, "created": "2025-09-15"},
-    {"name": "Rise - 2-8", "count": 100, "created": "2025-09-05"},
+    # Names without a " - <Greek letter>" suffix need an explicit username prefix
+    {"name": "Gonzalez-ULTIMATE", "count": 150, "created": "2025-09-15", "user_prefix": "Ultimate"},
+    {"name": "Rise - 2-8", "count": 100, "created": "2025-09-05", "user_prefix": "Rise"},
     {"name": "RM325 - G5 - Omicron", "count": 25, "created": "2025-09-05"},
     {"name": "RM324 - G5 - Xi", "count": 25, "created": "2025-09-05"},
     {"name": "RM234 - G4 - Nu", "count": 25, "created": "2025-09-05"},
@@ -58,6 +107,14 @@ def derive_grade_label(class_name: str) -> str:
         return "Multi"
     return "Other"
 
+def derive_user_prefix(class_name: str) -> str:
+    """
+    Returns the Tinkercad username prefix for a class, e.g. 'Kappa' for
+    'RM225 - G3 - Kappa' (students sign in as Kappa_001, Kappa_002, ...).
+    A class entry may override it with a "user_prefix" key.
+    """
+    return re.sub(r"[^A-Za-z0-9]+", "", class_name.split(" - ")[-1])
+
 def normalize_id(s: str) -> str:
     s = s.strip().lower()
     s = re.sub(r"[^a-z0-9]+", "-", s)
@@ -72,10 +129,21 @@ IMAGES_DIR = ROOT / "images"
 
 INDEX_HTML_PATH = ROOT / "index.html"
 PROJECTS_JSON_PATH = ROOT / "projects.json"
+PROJECTS_INDEX_PATH = ROOT / "projects.index.json"
+SHARDS_DIR = ROOT / "shards"
+SEARCH_INDEX_PATH = ROOT / "projects.search.json"
+ROLLUPS_PATH = ROOT / "projects.rollups.json"
+PROJECTS_COMPACT_PATH = ROOT / "projects.compact.json"
+TAG_TAXONOMY_PATH = DATA_DIR / "tag-taxonomy.json"
+VERSION_PATH = ROOT / "version.json"
+SW_PATH = ROOT / "sw.js"
+CLIENT_DATA_JS_PATH = ROOT / "showcase-data.js"
 README_PATH = ROOT / "README.md"
 
 SCHEMA_PATH = ROOT / "projects.schema.json"
 
+THUMBS_DIR = IMAGES_DIR / "thumbs"
+
 def ensure_dirs():
     for d in (ROOT, DATA_DIR, ROSTERS_DIR, IMAGES_DIR):
         d.mkdir(parents=True, exist_ok=True)
@@ -89,6 +157,22 @@ INDEX_HTML = dedent(r"""
   <title>STEM Tinkercad Showcase</title>
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <meta name="description" content="Interactive gallery and slideshow of student Tinkercad projects by grade and class." />
+  <meta name="generator" content="setup_showcase.py" />
+  <link rel="preconnect" href="https://www.tinkercad.com" />
+  <script>
+    // ?grade= jumps to that grade's prerendered page (--prerender), which
+    // paints its first cards before any data is fetched.
+    const PRERENDERED_PAGES = {};
+    (() => {
+      const params = new URLSearchParams(location.search);
+      const page = PRERENDERED_PAGES[params.get('grade')];
+      if (!page || document.documentElement.dataset.page === page) return;
+      params.delete('grade');
+      const rest = String(params);
+      location.replace(page + (rest ? `?${rest}` : '') + location.hash);
+    })();
+  </script>
+  <link rel="dns-prefetch" href="https://www.tinkercad.com" />
   <style>
     :root {
       --bg: #0f172a; --card: #111827; --muted: #94a3b8; --text: #e5e7eb;
@@ -143,12 +227,15 @@ INDEX_HTML = dedent(r"""
       transition: transform .08s ease, box-shadow .2s ease, border-color .2s ease; cursor: pointer; position: relative;
     }
     .card:hover { transform: translateY(-2px); border-color: #2b3b51; box-shadow: 0 12px 28px rgba(0,0,0,0.45); }
-    .thumb { width: 100%; aspect-ratio: 4/3; object-fit: cover; background: #0b1220; display: block; }
+    .thumb { width: 100%; height: auto; aspect-ratio: 4/3; object-fit: cover; background: #0b1220; display: block; }
+    picture { display: block; }
     .placeholder { width: 100%; aspect-ratio: 4/3; display: grid; place-items: center; background:
         repeating-conic-gradient(from 0deg, #0b1220 0 10deg, #0d1422 10deg 20deg); color: #a5b4fc; font-weight: 600; font-size: 0.95rem; }
     .meta { padding: 12px 14px 14px; display: grid; gap: 4px; font-size: 0.95rem; }
     .title { font-weight: 700; }
     .sub { color: var(--muted); font-size: 0.9rem; }
+    /* single-line text keeps every card the same height for the windowed grid */
+    .meta .title, .meta .sub { white-space: nowrap; overflow: hidden; text-overflow: ellipsis; }
 
     /* Modal / Slideshow */
     .overlay { position: fixed; inset: 0; background: rgba(2,6,23,0.84); backdrop-filter: blur(4px); display: none; align-items: center; justify-content: center; z-index: 1000; }
@@ -161,9 +248,12 @@ INDEX_HTML = dedent(r"""
     .viewer .ctrl { display: flex; gap: 8px; }
     .viewer .ctrl .btn { background: rgba(255,255,255,0.06); color: #e2e8f0; border: 1px solid var(--border); padding: 6px 10px; border-radius: 8px; }
     .frame-wrap { position: relative; width: 100%; height: 100%; background: #0b1220; }
+    /* pooled viewers: preloading frames stay hidden behind the active one */
+    .frame-wrap iframe { position: absolute; inset: 0; visibility: hidden; }
+    .frame-wrap iframe.active { visibility: visible; }
     iframe { width: 100%; height: 100%; border: 0; }
 
-    .nav { position: absolute; inset: 0; pointer-events: none; }
+    .nav { position: absolute; inset: 0; pointer-events: none; z-index: 1; }
     .nav button { pointer-events: auto; position: absolute; top: 50%; transform: translateY(-50%); width: 48px; height: 48px; border-radius: 50%; border: 1px solid var(--border); background: rgba(2,6,23,0.55); color: #e5e7eb; display: grid; place-items: center; cursor: pointer; transition: transform .08s ease, filter .2s ease; box-shadow: var(--shadow); }
     .nav button:hover { transform: translateY(-50%) scale(1.05); filter: brightness(1.1); }
     .nav .prev { left: 12px; }
@@ -177,6 +267,9 @@ INDEX_HTML = dedent(r"""
       .viewer { height: 76vh; }
       .bar { grid-template-columns: 1fr; }
     }
+    .debug-overlay { position: fixed; left: 10px; bottom: 10px; z-index: 100; pointer-events: none;
+      background: rgba(0,0,0,.8); color: #a7f3d0; font: 12px/1.5 ui-monospace, monospace;
+      white-space: pre; padding: 8px 10px; border-radius: 8px; }
   </style>
 </head>
 <body>
@@ -234,14 +327,22 @@ INDEX_HTML = dedent(r"""
     </div>
   </div>
 
+  <script src="showcase-data.js"></script>
   <script>
     // ------- Load data -------
     const params = new URLSearchParams(location.search);
     let DATA = { meta:{ title:"STEM Tinkercad Showcase", autoplayMs:9000 }, projects:[], classes:[] };
     let ALL = []; let LIST = []; let CLASSES = []; let GRADES = [];
-    let filterGrade = params.get('grade') || 'All';
+    // prerendered pages carry their filter on <html data-grade data-class>
+    const PRESET = document.documentElement.dataset;
+    let filterGrade = params.get('grade') || PRESET.grade || 'All';
     let filterClass = '__ALL__';
     let idx = 0; let autoplay = false; let timer = null;
+    let INDEX = null; let VERSION = null; const SHARDS = new Map();
+    let SEARCH = null; let BY_ORDINAL = null; let RANKS = {}; let searchTimer = null;
+    // False until the first refresh() has its data (and shards); until then
+    // the grid, including any prerendered cards, is left as it is.
+    let READY = false;
 
     // Elements
     const pageTitle = document.getElementById('pageTitle');
@@ -266,9 +367,7 @@ INDEX_HTML = dedent(r"""
     init();
     async function init() {
       try {
-        const res = await fetch('projects.json', { cache:'no-store' });
-        if (!res.ok) throw new Error('projects.json not found');
-        DATA = await res.json();
+        await loadData();
       } catch (e) {
         console.error(e);
         gridEl.innerHTML = `<div style="grid-column:1/-1;color:#fca5a5;background:#1f2937;padding:12px 14px;border:1px solid #374151;border-radius:10px;">
@@ -278,7 +377,7 @@ INDEX_HTML = dedent(r"""
       }
 
       pageTitle.textContent = DATA.meta?.title || 'STEM Tinkercad Showcase';
-      ALL = (DATA.projects || []).map(p => ({ ...p, _q: (p.title + ' ' + p.student + ' ' + (p.tags||[]).join(' ') + ' ' + p.klass).toLowerCase() }));
+      ALL = DATA.projects || [];
       CLASSES = DATA.classes || [];
       GRADES = ['All', ...Array.from(new Set(CLASSES.map(c => c.grade))).sort((a,b)=> (a==='All')? -1 : (a>b?1:-1))];
 
@@ -287,21 +386,119 @@ INDEX_HTML = dedent(r"""
 
       // Populate class select
       populateClasses();
+      if (PRESET.class && CLASSES.some(c => c.name === PRESET.class)) filterClass = classSelect.value = PRESET.class;
 
       // Wire controls
       wireControls();
 
       // Initial render
+      refresh();
+      loadSearchIndex();
+      warmEmbedOrigins();
+    }
+
+    // Data comes through showcase-data.js: version.json points at the current
+    // content-hashed files and the parsed dataset is cached in IndexedDB per
+    // version, so returning from another page is instant. A sharded build that
+    // isn't cached yet loads its index first and only the shards matching the
+    // active filter.
+    async function loadData() {
+      VERSION = await ShowcaseData.version();
+      const hit = await ShowcaseData.cached(VERSION);
+      if (hit) { DATA = hit; return; }
+      if (VERSION?.index) {
+        INDEX = await ShowcaseData.fetchJson(VERSION.index);
+        DATA = { meta: INDEX.meta, classes: INDEX.classes, projects: [] };
+        return;
+      }
+      DATA = await ShowcaseData.load();
+    }
+    function ensureShards() {
+      if (!INDEX) return Promise.resolve();
+      const wanted = INDEX.shards.filter(s =>
+        (filterGrade === 'All' || s.grades.includes(filterGrade)) &&
+        (filterClass === '__ALL__' || s.classes.includes(filterClass)));
+      wanted.forEach(s => {
+        if (SHARDS.has(s.file)) return;
+        const load = ShowcaseData.fetchJson(s.file)
+          .then(shard => { ALL.push(...(shard.projects || []).map(ShowcaseData.withSearchText)); BY_ORDINAL = null; })
+          .catch(e => { SHARDS.delete(s.file); throw e; });
+        SHARDS.set(s.file, load);
+      });
+      return Promise.all(wanted.map(s => SHARDS.get(s.file)));
+    }
+    async function refresh() {
+      if (INDEX) {
+        countText.textContent = 'Loading…';
+        const fetched = ShowcaseData.span('fetch shards');
+        try { await ensureShards(); } catch (e) { console.error(e); }
+        fetched();
+      }
+      READY = true;
       applyFilter();
     }
 
+    // ------- Search (prebuilt inverted index, prefix lookup) -------
+    // projects.search.json: { ids:[...], tokens:[sorted], postings:[[ordinal,...], ...],
+    // orders:{ <sort>:[ordinal,...] } }. Until it loads (or if it is missing)
+    // search falls back to a substring scan and sorting to a comparator.
+    function loadSearchIndex() {
+      fetch(VERSION?.search || 'projects.search.json')
+        .then(r => r.ok ? r.json() : null)
+        .then(ix => { if (ix) { SEARCH = ix; BY_ORDINAL = null; RANKS = {}; applyFilter(); } })
+        .catch(e => console.error(e));
+    }
+    // The loaded project for each ordinal in SEARCH.ids (null while its shard
+    // is not loaded). Repeated ids are matched up in order of appearance.
+    function projectsByOrdinal() {
+      if (!BY_ORDINAL) {
+        const byId = new Map();
+        ALL.forEach(p => { if (!byId.has(p.id)) byId.set(p.id, []); byId.get(p.id).push(p); });
+        const seen = new Map();
+        BY_ORDINAL = SEARCH.ids.map(id => {
+          const k = seen.get(id) || 0; seen.set(id, k + 1);
+          return (byId.get(id) || [])[k] || null;
+        });
+      }
+      return BY_ORDINAL;
+    }
+    // rank[ordinal] = position in SEARCH.orders[sort]; built once per sort so a
+    // search only sorts its own hits.
+    function sortRank(sort) {
+      if (!RANKS[sort]) {
+        const rank = new Int32Array(SEARCH.ids.length);
+        SEARCH.orders[sort].forEach((n, i) => { rank[n] = i; });
+        RANKS[sort] = rank;
+      }
+      return RANKS[sort];
+    }
+    function tokenize(s) { return String(s ?? '').toLowerCase().match(/[\p{L}\p{N}]+/gu) || []; }
+    function lowerBound(arr, t) {
+      let lo = 0, hi = arr.length;
+      while (lo < hi) { const mid = (lo + hi) >> 1; if (arr[mid] < t) lo = mid + 1; else hi = mid; }
+      return lo;
+    }
+    // Returns the ordinals matching every query term as a prefix of some token.
+    function searchMatches(q) {
+      let hits = null;
+      for (const term of tokenize(q)) {
+        const found = new Set();
+        for (let i = lowerBound(SEARCH.tokens, term); i < SEARCH.tokens.length && SEARCH.tokens[i].startsWith(term); i++) {
+          for (const n of SEARCH.postings[i]) if (!hits || hits.has(n)) found.add(n);
+        }
+        hits = found;
+        if (hits.size === 0) break;
+      }
+      return hits || new Set();
+    }
+
     function renderGradeFilters() {
       gradeFilters.innerHTML = '';
       GRADES.forEach(g => {
         const btn = document.createElement('button');
         btn.className = 'chip' + (g === filterGrade ? ' active' : '');
         btn.textContent = g;
-        btn.onclick = () => { filterGrade = g; syncGradeChips(); populateClasses(); applyFilter(); };
+        btn.onclick = () => { filterGrade = g; syncGradeChips(); populateClasses(); refresh(); };
         gradeFilters.appendChild(btn);
       });
     }
@@ -319,8 +516,11 @@ INDEX_HTML = dedent(r"""
     }
 
     function wireControls() {
-      classSelect.addEventListener('change', () => { filterClass = classSelect.value; applyFilter(); });
-      searchBox.addEventListener('input', () => applyFilter());
+      classSelect.addEventListener('change', () => { filterClass = classSelect.value; refresh(); });
+      searchBox.addEventListener('input', () => {
+        clearTimeout(searchTimer);
+        searchTimer = setTimeout(applyFilter, 150);
+      });
       sortSelect.addEventListener('change', () => applyFilter());
 
       closeBtn.addEventListener('click', closeViewer);
@@ -329,6 +529,12 @@ INDEX_HTML = dedent(r"""
       autoBtn.addEventListener('click', toggleAutoplay);
       presentBtn.addEventListener('click', () => openViewer(0));
       overlay.addEventListener('click', (e) => { if (e.target === overlay) closeViewer(); });
+      gridEl.addEventListener('click', (e) => {
+        const card = e.target.closest('.card');
+        if (card && card.parentNode === gridEl) openViewer(Number(card.getAttribute('data-idx')));
+      });
+      addEventListener('scroll', scheduleWindow, { passive: true });
+      addEventListener('resize', () => { rowHeight = 0; scheduleWindow(); });
 
       document.addEventListener('keydown', (e) => {
         if (!overlay.classList.contains('open')) return;
@@ -339,48 +545,179 @@ INDEX_HTML = dedent(r"""
       });
     }
 
+    // Fallback sorts for before the search index loads; ties go by id, as in
+    // the prebuilt orders.
+    const cmp = (a, b) => a < b ? -1 : a > b ? 1 : 0;
+    const COMPARATORS = {
+      'date-asc': (a, b) => cmp(a.date||'', b.date||'') || cmp(a.id, b.id),
+      'date-desc': (a, b) => cmp(b.date||'', a.date||'') || cmp(a.id, b.id),
+      'title-asc': (a, b) => (a.title||'').localeCompare(b.title||'') || cmp(a.id, b.id),
+      'student-asc': (a, b) => (a.student||'').localeCompare(b.student||'') || cmp(a.id, b.id),
+    };
+
     function applyFilter() {
+      if (!READY) return;  // refresh() filters once the data is in
+      const filtered = ShowcaseData.span('filter');
       const q = (searchBox.value || '').toLowerCase().trim();
-
-      LIST = ALL.filter(p => {
-        const gradeMatch = (filterGrade === 'All') || (p.grade === filterGrade);
-        const classMatch = (filterClass === '__ALL__') || (p.klass === filterClass);
-        const searchMatch = !q || p._q.includes(q);
-        return gradeMatch && classMatch && searchMatch;
-      });
-
-      // Sort
       const sort = sortSelect.value;
-      LIST.sort((a, b) => {
-        switch (sort) {
-          case 'date-asc': return (a.date||'') < (b.date||'') ? -1 : 1;
-          case 'date-desc': return (a.date||'') > (b.date||'') ? -1 : 1;
-          case 'title-asc': return (a.title||'').localeCompare(b.title||'');
-          case 'student-asc': return (a.student||'').localeCompare(b.student||'');
-          default: return 0;
+      const keep = p => (filterGrade === 'All' || p.grade === filterGrade) &&
+                        (filterClass === '__ALL__' || p.klass === filterClass || (p.alsoIn || []).includes(filterClass));
+      const order = SEARCH?.orders?.[sort];
+
+      if (order && q) {
+        // Only the matching ordinals are touched, then sorted by their rank.
+        const byOrdinal = projectsByOrdinal(), rank = sortRank(sort);
+        LIST = Array.from(searchMatches(q)).filter(n => byOrdinal[n] && keep(byOrdinal[n]))
+          .sort((a, b) => rank[a] - rank[b]).map(n => byOrdinal[n]);
+      } else if (order) {
+        // No search text: one pass over the prebuilt order, already sorted.
+        const byOrdinal = projectsByOrdinal();
+        LIST = [];
+        for (const n of order) {
+          const p = byOrdinal[n];
+          if (p && keep(p)) LIST.push(p);
         }
-      });
+      } else {
+        LIST = ALL.filter(p => keep(p) && (!q || p._q.includes(q)));
+        if (COMPARATORS[sort]) LIST.sort(COMPARATORS[sort]);
+      }
+      filtered();
 
       renderGrid();
       countText.textContent = `${LIST.length} project${LIST.length!==1?'s':''}`;
     }
 
+    // ------- Grid (windowed) -------
+    // Only the rows in view plus a buffer are in the DOM. Cards live in a pool
+    // of slots (slot = index % capacity) and CSS `order` places them, so
+    // scrolling one row only refills the cards that came into view.
+    const CARD_MIN = 240, GRID_GAP = 16, ROW_BUFFER = 2;
+    let cardPool = []; let rowHeight = 0; let frameQueued = false;
+    // Cards already in the markup of a prerendered page; the first render
+    // adopts the ones it needs (same index and id) and drops the rest.
+    const PRERENDERED = new Map(Array.from(gridEl.querySelectorAll('.card'), c => [Number(c.getAttribute('data-idx')), c]));
+
     function renderGrid() {
-      gridEl.innerHTML = LIST.map((p, i) => cardTemplate(p, i)).join('');
-      gridEl.querySelectorAll('.card').forEach(card => {
-        card.addEventListener('click', () => openViewer(Number(card.getAttribute('data-idx'))));
+      cardPool.forEach(card => { card._idx = -1; });
+      renderWindow();
+    }
+    function scheduleWindow() {
+      if (frameQueued) return;
+      frameQueued = true;
+      requestAnimationFrame(() => { frameQueued = false; renderWindow(); });
+    }
+    function renderWindow() {
+      if (!READY) return;  // scrolling while shards load keeps the prerendered cards
+      const rendered = ShowcaseData.span('render');
+      const style = getComputedStyle(gridEl);
+      const width = gridEl.clientWidth - parseFloat(style.paddingLeft) - parseFloat(style.paddingRight);
+      const cols = Math.max(1, Math.floor((width + GRID_GAP) / (CARD_MIN + GRID_GAP)));
+      const rowH = rowHeight || 300; // estimate until a card has been measured
+      const rows = Math.ceil(LIST.length / cols);
+      const top = gridEl.getBoundingClientRect().top;
+      const end = Math.min(rows, Math.ceil((innerHeight - top) / rowH) + ROW_BUFFER);
+      const first = Math.max(0, Math.min(end, Math.floor(-top / rowH) - ROW_BUFFER));
+      const start = first * cols;
+      const stop = Math.min(LIST.length, end * cols);
+
+      const capacity = (Math.ceil(innerHeight / rowH) + 2 * ROW_BUFFER + 2) * cols;
+      if (cardPool.length > capacity) {
+        cardPool.splice(capacity).forEach(card => card && card.remove());
+        cardPool.forEach(card => { card._idx = -1; });
+      }
+      const live = new Set();
+      for (let i = start; i < stop; i++) {
+        const slot = i % capacity;
+        let card = cardPool[slot];
+        if (!card) {
+          const pre = PRERENDERED.get(i);
+          card = cardPool[slot] = pre && pre.getAttribute('data-id') === LIST[i].id ? pre : htmlToElement(cardTemplate(LIST[i], i));
+          PRERENDERED.delete(i);
+          card._idx = i; card._thumb = LIST[i].thumbnail;
+        } else if (card._idx !== i) {
+          fillCard(card, LIST[i], i);
+        }
+        card.style.order = String(i);
+        if (card.parentNode !== gridEl) gridEl.appendChild(card);
+        live.add(slot);
+      }
+      cardPool.forEach((card, slot) => { if (!live.has(slot) && card.parentNode === gridEl) gridEl.removeChild(card); });
+      PRERENDERED.forEach(card => card.remove());
+      PRERENDERED.clear();
+
+      gridEl.style.paddingTop = `${first * rowH}px`;
+      gridEl.style.paddingBottom = `${Math.max(0, rows - end) * rowH}px`;
+
+      if (!rowHeight && stop > start) {
+        const h = cardPool[start % capacity].offsetHeight;
+        if (h) { rowHeight = h + GRID_GAP; scheduleWindow(); }
+      }
+      rendered();
+      showTimings();
+    }
+
+    // ------- ?debug=1: latest fetch/parse/filter/render timings -------
+    const DEBUG = new URLSearchParams(location.search).get('debug') === '1';
+    let debugEl = null; let debugQueued = false;
+    function showTimings() {
+      if (!DEBUG || debugQueued) return;
+      debugQueued = true;
+      requestAnimationFrame(() => {
+        debugQueued = false;
+        if (!debugEl) {
+          debugEl = document.createElement('div');
+          debugEl.className = 'debug-overlay';
+          document.body.appendChild(debugEl);
+        }
+        debugEl.textContent = performance.getEntriesByType('measure')
+          .map(m => `${m.name.padEnd(12)} ${m.duration.toFixed(1).padStart(8)} ms`).join('\n') +
+          `\n${'projects'.padEnd(12)} ${String(LIST.length).padStart(8)} / ${ALL.length}`;
       });
     }
+    function fillCard(card, p, i) {
+      card._idx = i;
+      card.setAttribute('data-idx', i);
+      card.setAttribute('data-id', p.id);
+      card.setAttribute('title', `Open ${p.title}`);
+      if (card._thumb !== p.thumbnail) {
+        card.replaceChild(htmlToElement(thumbTemplate(p)), card.firstElementChild);
+        card._thumb = p.thumbnail;
+      }
+      card.querySelector('.title').textContent = p.title;
+      card.querySelector('.sub').textContent = `${p.student} • ${p.klass}`;
+    }
+    function htmlToElement(html) {
+      const t = document.createElement('template');
+      t.innerHTML = html.trim();
+      return t.content.firstElementChild;
+    }
+
+    // Builds run with --thumbnails add thumbSrcset {avif, webp, jpeg} plus
+    // thumbWidth/thumbHeight, so the browser picks a small modern file and
+    // reserves the box before it loads.
+    const THUMB_SIZES = '(max-width: 640px) 100vw, 300px';
+    function thumbTemplate(p) {
+      if (!(p.thumbnail && p.thumbnail.trim().length > 0)) return `<div class="placeholder">No thumbnail</div>`;
+      const alt = `${escapeAttr(p.title)} thumbnail`;
+      const set = p.thumbSrcset;
+      if (!set) return `<img class="thumb" src="${escapeAttr(p.thumbnail)}" alt="${alt}" loading="lazy" />`;
+      const sources = ['avif', 'webp']
+        .filter(fmt => set[fmt])
+        .map(fmt => `<source type="image/${fmt}" srcset="${escapeAttr(set[fmt])}" sizes="${THUMB_SIZES}" />`)
+        .join('');
+      const dims = p.thumbWidth && p.thumbHeight ? ` width="${p.thumbWidth}" height="${p.thumbHeight}"` : '';
+      const fallback = set.jpeg ? ` srcset="${escapeAttr(set.jpeg)}" sizes="${THUMB_SIZES}"` : '';
+      return `<picture>${sources}<img class="thumb" src="${escapeAttr(p.thumbnail)}"${fallback}${dims} alt="${alt}" loading="lazy" decoding="async" /></picture>`;
+    }
 
+    // Mirrored by card_html() in setup_showcase.py for prerendered pages.
     function cardTemplate(p, i) {
-      const img = p.thumbnail && p.thumbnail.trim().length > 0
-        ? `<img class="thumb" src="${escapeAttr(p.thumbnail)}" alt="${escapeAttr(p.title)} thumbnail" loading="lazy" />`
-        : `<div class="placeholder">No thumbnail</div>`;
+      const img = thumbTemplate(p);
       const title = escapeHtml(p.title);
       const sub = `${escapeHtml(p.student)} • ${escapeHtml(p.klass)}`;
 
       return `
-        <article class="card" data-idx="${i}" title="Open ${escapeAttr(p.title)}">
+        <article class="card" data-idx="${i}" data-id="${escapeAttr(p.id)}" title="Open ${escapeAttr(p.title)}">
           ${img}
           <div class="meta">
             <div class="title">${title}</div>
@@ -403,14 +740,90 @@ INDEX_HTML = dedent(r"""
       overlay.setAttribute('aria-hidden', 'true');
       document.body.style.overflow = '';
       stopAutoplay();
-      viewerFrame.src = 'about:blank';
+      releaseFrames();
     }
     function updateViewer() {
       const p = LIST[idx];
       viewerTitle.textContent = `${p.title} — ${p.student}`;
       viewerTag.textContent = `${p.klass} • ${p.grade}`;
       status.textContent = `${idx + 1} / ${LIST.length}`;
-      viewerFrame.src = p.embedUrl;
+      showFrame(p.embedUrl);
+    }
+
+    // ------- Viewer iframe pool -------
+    // While a slide shows, the next embeds in LIST order load in hidden
+    // iframes, so advancing swaps in a viewer that is already warm. Frames are
+    // keyed by embedUrl and the least recently used one is recycled once the
+    // pool is full, which bounds memory on low-end displays.
+    const PRELOAD_AHEAD = (navigator.deviceMemory || 4) <= 2 ? 1 : 2;
+    const POOL_MAX = PRELOAD_AHEAD + 2; // current + previous + preloads
+    const framePool = new Map(); // embedUrl -> iframe, least recently used first
+    const spareFrames = [viewerFrame];
+    let preloadTimer = null; let pendingLoad = null;
+
+    function upcomingUrls() {
+      const urls = new Set([LIST[idx].embedUrl]);
+      for (let k = 1; k <= PRELOAD_AHEAD && k < LIST.length; k++) urls.add(LIST[(idx + k) % LIST.length].embedUrl);
+      return urls;
+    }
+    function frameFor(url, keep) {
+      let frame = framePool.get(url);
+      if (frame) { framePool.delete(url); framePool.set(url, frame); return frame; }
+      frame = spareFrames.pop();
+      if (!frame && framePool.size >= POOL_MAX) {
+        for (const [u, f] of framePool) {
+          if (!keep.has(u) && !f.classList.contains('active')) { framePool.delete(u); frame = f; break; }
+        }
+      }
+      if (!frame) {
+        frame = document.createElement('iframe');
+        ['allowfullscreen', 'title', 'referrerpolicy'].forEach(a => frame.setAttribute(a, viewerFrame.getAttribute(a) ?? ''));
+        viewerFrame.parentNode.insertBefore(frame, viewerFrame);
+      }
+      frame.setAttribute('loading', 'eager');
+      frame.src = url;
+      framePool.set(url, frame);
+      return frame;
+    }
+    function showFrame(url) {
+      const frame = frameFor(url, upcomingUrls());
+      framePool.forEach(f => f.classList.toggle('active', f === frame));
+      schedulePreload(frame);
+    }
+    // Start preloading once the visible embed has loaded (or after a third of
+    // the autoplay interval) so preloads don't compete with the current slide.
+    function schedulePreload(frame) {
+      clearTimeout(preloadTimer);
+      if (pendingLoad) pendingLoad.frame.removeEventListener('load', pendingLoad.fn);
+      const fn = () => { clearTimeout(preloadTimer); frame.removeEventListener('load', fn); pendingLoad = null; preloadUpcoming(); };
+      pendingLoad = { frame, fn };
+      frame.addEventListener('load', fn);
+      preloadTimer = setTimeout(fn, Math.min(3000, (DATA.meta?.autoplayMs || 9000) / 3));
+    }
+    function preloadUpcoming() {
+      if (!overlay.classList.contains('open') || LIST.length < 2) return;
+      const keep = upcomingUrls();
+      keep.forEach(url => { if (!framePool.has(url)) frameFor(url, keep); });
+    }
+    function releaseFrames() {
+      clearTimeout(preloadTimer);
+      if (pendingLoad) { pendingLoad.frame.removeEventListener('load', pendingLoad.fn); pendingLoad = null; }
+      framePool.forEach(f => { f.src = 'about:blank'; f.classList.remove('active'); spareFrames.push(f); });
+      framePool.clear();
+    }
+    // Preconnect to every embed host in the data (Tinkercad is already in <head>).
+    function warmEmbedOrigins() {
+      const origins = new Set(['https://www.tinkercad.com']);
+      for (const p of ALL) {
+        try { origins.add(new URL(p.embedUrl).origin); } catch (e) { /* not a URL */ }
+        if (origins.size > 4) break;
+      }
+      origins.forEach(origin => {
+        if (origin === 'https://www.tinkercad.com') return;
+        const link = document.createElement('link');
+        link.rel = 'preconnect'; link.href = origin;
+        document.head.appendChild(link);
+      });
     }
     function prev() { idx = (idx - 1 + LIST.length) % LIST.length; updateViewer(); }
     function next() { idx = (idx + 1) % LIST.length; updateViewer(); }
@@ -463,10 +876,19 @@ PROJECTS_SCHEMA = {
                     "student": {"type": "string"},
                     "klass": {"type": "string"},
                     "grade": {"type": "string"},
+                    "month": {"type": "string"},
+                    "tool": {"type": "string"},
                     "thumbnail": {"type": "string"},
                     "embedUrl": {"type": "string"},
                     "tags": {"type": "array", "items": {"type": "string"}},
-                    "date": {"type": "string"}
+                    "date": {"type": "string"},
+                    "thumbSrcset": {
+                        "type": "object",
+                        "additionalProperties": {"type": "string"}
+                    },
+                    "thumbWidth": {"type": "number"},
+                    "thumbHeight": {"type": "number"},
+                    "alsoIn": {"type": "array", "items": {"type": "string"}}
                 },
                 "required": ["id", "title", "student", "klass", "grade", "embedUrl"]
             }
@@ -484,17 +906,30 @@ Data-driven, static site to showcase student Tinkercad projects by **grade** and
 ## Structure
 ```
 showcase/
-├── index.html          # Static site (fetches projects.json)
+├── index.html          # Static site (reads version.json, then the data it names)
+├── showcase-data.js    # Shared data loader used by every page (IndexedDB cache per build)
+├── sw.js               # Service worker: offline, stale-while-revalidate
 ├── projects.json       # Your data (meta, classes, projects)
+├── version.json        # Pointer to the current content-hashed files (generated by --build-json)
+├── projects.<hash>.json        # Hashed copy of projects.json
+├── projects.search.<hash>.json # Prebuilt search index
+├── projects.compact.<hash>.json # (--compact) Same data, dictionary-encoded and column-wise
+├── projects.rollups.<hash>.json # Counts by month/grade/tool and per class for home + curriculum
+├── projects.index.<hash>.json  # (Sharded builds) meta, classes, counts + shard list
+├── shards/             # (Sharded builds) one hashed projects file per class or grade
+├── grade/, class/      # (--prerender) static page per grade and per class
 ├── projects.schema.json# (Optional) JSON schema for validation in editors
+├── data/showcase.db    # (--store) SQLite copy of classes + projects for queries
+├── data/tag-taxonomy.json # Keywords -> tags for --auto-tag and parse_kappa_dump.py
 ├── rosters/            # CSV templates per class
-└── images/             # Optional thumbnails
+└── images/             # Optional thumbnails (images/thumbs/ is generated)
 ```
 
 ## Workflow
 
 1. **Fill rosters** in `rosters/*.csv`:
    - Columns: id, title, student, klass, grade, thumbnail, embedUrl, tags, date
+     (curriculum rosters may add `month` and `tool` after grade, as in `curriculum-template.csv`)
    - Use **first name + last initial** for privacy
    - Paste Tinkercad **embed** URLs (Share → Embed)
 
@@ -503,7 +938,17 @@ showcase/
    python setup_showcase.py --build-json
    ```
 
-3. Open `index.html` to preview locally.
+   For large sites, shard the output so pages only download what they show:
+   ```bash
+   python setup_showcase.py --build-json --shard class   # or: --shard grade
+   ```
+   Add `--no-combined` to skip writing the single `projects.json`.
+
+3. Open `index.html` to preview locally, or run a dev server that rebuilds
+   when you save a roster or image and reloads open pages:
+   ```bash
+   python setup_showcase.py --serve --watch
+   ```
 
 4. **Publish on GitHub Pages**:
    - Create a repo and push the `showcase/` contents to it
@@ -511,70 +956,462 @@ showcase/
    - Share the Pages URL
 
 ## Tips
-- Thumbnails are optional; use `images/` to store them.
+- `python setup_showcase.py --build-json --check-embeds` opens every embed link and
+  lists missing or private ones (HTTP 4xx) in `data/build-report.json`. Results
+  are cached for a week, so repeat builds only check new links.
+- `python setup_showcase.py --release` writes a deploy-ready copy to `dist/`:
+  minified pages, compact JSON and `showcase-data.js` under content-hashed names, and `.gz` (plus `.br`
+  with `pip install brotli`) files for servers that serve precompressed assets.
+- `python setup_showcase.py --build-json --store` keeps `data/showcase.db` (SQLite)
+  in sync with the rosters, so questions like "projects per grade this month" or
+  "students without an embed" don't re-read every CSV:
+  `--query per-grade --month this`, `--query missing-embeds --class "..."`, or
+  `--sql "SELECT ..."`. `--export` writes the site data back out of the store.
+- `data/tag-taxonomy.json` maps each tag to title keywords (case-insensitive, matched
+  anywhere in the title). `parse_kappa_dump.py` always uses it; add `--auto-tag` to
+  `--build-json` to tag hand-made rosters too, and `--tag-stats` for hit counts.
+- Thumbnails are optional; use `images/` to store them. With Pillow installed,
+  `python setup_showcase.py --build-json --thumbnails` writes small AVIF/WebP/JPEG
+  variants to `images/thumbs/` and the gallery serves the right size.
 - Slideshow auto-advance default is **9s** (change `meta.autoplayMs` in `projects.json`).
 - URL supports a grade filter: `?grade=Grade%203`
+- `python setup_showcase.py --build-json --prerender` writes `grade/<grade>.html` and
+  `class/<class>.html` with the first cards already in the markup, so slow classroom
+  displays show projects before any data loads; `?grade=` links jump to them.
+  A hand-edited `index.html` (one without the generator meta tag) is left alone.
 """).strip("\n")
 
+# ---------- Atomic, streamed writes ----------
+STREAM_BATCH = 1000  # list items encoded per write when streaming JSON
+
+class StreamSink:
+    """File-like writer that hashes what passes through it."""
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.path = None
+
+    def write(self, s: str):
+        self.f.write(s)
+        self.sha256.update(s.encode("utf-8"))
+
+@contextmanager
+def atomic_writer(path: Path, hashed: bool = False):
+    """
+    Yields a StreamSink on a temp file beside `path`. On success the file is
+    fsynced and renamed over `path` (or to <stem>.<hash><suffix> when `hashed`,
+    left in sink.path), so readers see the old file or the new one, never a
+    partial write. On error the temp file is removed.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            sink = StreamSink(f)
+            yield sink
+            f.flush()
+            os.fsync(f.fileno())
+        digest = sink.sha256.hexdigest()[:10]
+        sink.path = path.with_name(f"{path.stem}.{digest}{path.suffix}") if hashed else path
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, sink.path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except FileNotFoundError:
+            pass
+        raise
+
+def write_text_atomic(path: Path, text: str):
+    with atomic_writer(path) as sink:
+        sink.write(text)
+
+def write_json_atomic(path: Path, obj, indent=None):
+    """Small JSON files: one dumps, written atomically."""
+    separators = (",", ":") if indent is None else None
+    write_text_atomic(path, json.dumps(obj, ensure_ascii=False, indent=indent, separators=separators))
+
+def write_json_stream(sink, obj):
+    """
+    Writes `obj` as minified JSON, same bytes as json.dumps(separators=(",", ":")),
+    encoding long lists STREAM_BATCH items at a time so no full-size string
+    is ever built.
+    """
+    if isinstance(obj, dict):
+        sink.write("{")
+        for n, (k, v) in enumerate(obj.items()):
+            sink.write(("," if n else "") + json.dumps(str(k), ensure_ascii=False) + ":")
+            write_json_stream(sink, v)
+        sink.write("}")
+    elif isinstance(obj, list) and len(obj) > STREAM_BATCH:
+        sink.write("[")
+        for i in range(0, len(obj), STREAM_BATCH):
+            batch = json.dumps(obj[i:i + STREAM_BATCH], ensure_ascii=False, separators=(",", ":"))
+            sink.write(("," if i else "") + batch[1:-1])
+        sink.write("]")
+    else:
+        sink.write(json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
+
+def write_projects_json(sink, meta: dict, classes: list, projects) -> int:
+    """
+    Streams {meta, classes, projects} one project at a time, byte-identical to
+    json.dumps(indent=2). `projects` may be any iterable; returns the count.
+    """
+    head = json.dumps({"meta": meta, "classes": classes}, ensure_ascii=False, indent=2)
+    sink.write(head[:-2] + ',\n  "projects": [')
+    n = 0
+    for p in projects:
+        item = json.dumps(p, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+        sink.write(("," if n else "") + "\n    " + item)
+        n += 1
+    sink.write("\n  ]\n}" if n else "]\n}")
+    return n
+
+class SizeSink:
+    """Counts raw and gzipped bytes of what is written, without keeping it."""
+    def __init__(self):
+        self.gz = zlib.compressobj(9, zlib.DEFLATED, 31)
+        self.size = 0
+        self.gz_size = 0
+
+    def write(self, s: str):
+        b = s.encode("utf-8")
+        self.size += len(b)
+        self.gz_size += len(self.gz.compress(b))
+
+    def close(self):
+        self.gz_size += len(self.gz.flush())
+        return self
+
+def measure_json(obj) -> SizeSink:
+    sink = SizeSink()
+    write_json_stream(sink, obj)
+    return sink.close()
+
 # ---------- Utility to write initial files ----------
-def write_initial_files(seed_n: int = 0):
-    ensure_dirs()
+ROSTER_HEADERS = ["id","title","student","klass","grade","thumbnail","embedUrl","tags","date"]
+# Curriculum rosters (rosters/curriculum-template.csv) add month + tool after grade
+CURRICULUM_HEADERS = ["id","title","student","klass","grade","month","tool","thumbnail","embedUrl","tags","date"]
 
-    # Build class list with derived grade
-    classes = []
-    for c in RAW_CLASSES:
-        grade = derive_grade_label(c["name"])
-        classes.append({
-            "name": c["name"],
-            "grade": grade,
-            "count": c["count"],
-            "created": c["created"]
-        })
+PLACEHOLDER_EMBED_URL = "https://www.tinkercad.com/embed/XXXXXXXXX?autostart=true"
 
-    # Write index.html
-    INDEX_HTML_PATH.write_text(INDEX_HTML, encoding="utf-8")
+def iter_placeholder_projects(classes, seed_n: int):
+    """Yields seed_n placeholder projects per class, one at a time."""
+    today = str(date.today())
+    for c in classes:
+        klass = c["name"]
+        grade = c["grade"]
+        for i in range(seed_n):
+            yield {
+                "id": f"{normalize_id(klass)}-placeholder-{i+1}",
+                "title": f"Project {i+1}",
+                "student": f"Student {i+1}",
+                "klass": klass,
+                "grade": grade,
+                "thumbnail": "",
+                "embedUrl": PLACEHOLDER_EMBED_URL,
+                "tags": ["placeholder"],
+                "date": today
+            }
 
-    # Base projects.json
-    base = {
-        "meta": {
-            "title": "STEM Tinkercad Showcase – 2025",
-            "updated": str(date.today()),
-            "autoplayMs": 9000
-        },
-        "classes": classes,
-        "projects": []
-    }
-
-    # Optionally seed N placeholders per class for quick testing
-    if seed_n > 0:
-        for c in classes:
-            klass = c["name"]
-            grade = c["grade"]
-            base["projects"].extend([
-                {
-                    "id": f"{normalize_id(klass)}-placeholder-{i+1}",
-                    "title": f"Project {i+1}",
-                    "student": f"Student {i+1}",
-                    "klass": klass,
-                    "grade": grade,
-                    "thumbnail": "",
-                    "embedUrl": "https://www.tinkercad.com/embed/XXXXXXXXX?autostart=true",
-                    "tags": ["placeholder"],
-                    "date": str(date.today())
-                } for i in range(seed_n)
-            ])
+def placeholder_projects(classes, seed_n: int) -> list:
+    """Returns seed_n placeholder projects per class (used by the benchmarks)."""
+    return list(iter_placeholder_projects(classes, seed_n))
+
+# ---------- Shared data module (showcase-data.js) ----------
+CLIENT_DATA_JS = dedent(r"""
+// Generated by setup_showcase.py. One data layer for every showcase page:
+//   const data = await ShowcaseData.load();  // { meta, classes, projects }
+//   const summary = await ShowcaseData.rollups();  // counts only (projects.rollups.json)
+// Projects come back with a lowercased `_q` search field. The parsed dataset
+// is kept in IndexedDB under the build's version (version.json), so moving
+// between pages reuses it until a new build is published.
+(function () {
+  const DB_NAME = 'showcase', STORE = 'datasets';
+  let versionPromise = null;
+
+  function fetchJson(url, opts) {
+    return fetch(url, opts).then(r => { if (!r.ok) throw new Error(url + ' not found'); return r.json(); });
+  }
+
+  // version.json: { version, updated, data?, compact?, index?, search }, or null
+  // when the site has no build pointer (then projects.json is read directly).
+  function version() {
+    if (!versionPromise) versionPromise = fetchJson('version.json', { cache:'no-cache' }).catch(() => null);
+    return versionPromise;
+  }
+
+  // performance.measure() spans (fetch, parse, cache, ...); only the latest
+  // measure per name is kept. Pages show them with ?debug=1.
+  function span(name) {
+    if (typeof performance === 'undefined' || !performance.measure) return () => {};
+    const start = name + ':start', end = name + ':end';
+    performance.mark(start);
+    return () => {
+      performance.mark(end);
+      performance.clearMeasures(name);
+      performance.measure(name, start, end);
+      performance.clearMarks(start); performance.clearMarks(end);
+    };
+  }
+
+  function withSearchText(p) {
+    return { ...p, _q: (p.title + ' ' + p.student + ' ' + (p.tags||[]).join(' ') + ' ' + p.klass).toLowerCase() };
+  }
+
+  // projects.compact.json keeps klass/grade/tags in lookup tables and the
+  // projects column-wise; rebuild the same objects projects.json holds.
+  // Rows in embedWhole hold the whole embed URL rather than a Tinkercad id.
+  function decodeCompact(c) {
+    const col = c.columns, projects = new Array(c.count), whole = new Set(c.embedWhole);
+    for (let i = 0; i < c.count; i++) {
+      const embed = col.embed[i];
+      const p = {
+        id: col.id[i], title: col.title[i], student: col.student[i],
+        klass: c.klasses[col.klass[i]], grade: c.grades[col.grade[i]],
+        thumbnail: col.thumbnail[i],
+        embedUrl: whole.has(i) ? embed : c.embedPrefix + embed + c.embedSuffix,
+        tags: col.tags[i].map(t => c.tags[t]), date: col.date[i]
+      };
+      for (const k of c.extra) if (col[k][i] !== null) p[k] = col[k][i];
+      projects[i] = p;
+    }
+    return { meta: c.meta, classes: c.classes, projects };
+  }
+
+  // The whole dataset from the network: compact payload, combined file, or
+  // every shard of a sharded build.
+  async function fetchDataset(v) {
+    let data;
+    const fetched = span('fetch');
+    if (v?.compact) {
+      data = await fetchJson(v.compact);
+    } else if (v?.data || !v?.index) {
+      data = await fetchJson(v?.data || 'projects.json', { cache: v?.data ? 'default' : 'no-cache' });
+    } else {
+      const index = await fetchJson(v.index);
+      const shards = await Promise.all(index.shards.map(s => fetchJson(s.file)));
+      data = { meta: index.meta, classes: index.classes, projects: shards.flatMap(s => s.projects || []) };
+    }
+    fetched();
+    const parsed = span('parse');
+    if (v?.compact) data = decodeCompact(data);
+    data = { meta: data.meta || {}, classes: data.classes || [], projects: (data.projects || []).map(withSearchText) };
+    parsed();
+    return data;
+  }
+
+  // IndexedDB is optional (private windows, old browsers): every failure just
+  // means "not cached".
+  function openDb() {
+    return new Promise(resolve => {
+      try {
+        const req = indexedDB.open(DB_NAME, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(STORE);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => resolve(null);
+      } catch (e) { resolve(null); }
+    });
+  }
+  async function cached(v) {
+    const done = span('cache');
+    const db = v && await openDb();
+    if (!db) return null;
+    return new Promise(resolve => {
+      try {
+        const req = db.transaction(STORE).objectStore(STORE).get(v.version);
+        req.onsuccess = () => { done(); resolve(req.result || null); };
+        req.onerror = () => resolve(null);
+      } catch (e) { resolve(null); }
+    });
+  }
+  async function store(v, data) {
+    const db = await openDb();
+    if (!db) return;
+    try {
+      const st = db.transaction(STORE, 'readwrite').objectStore(STORE);
+      st.clear();  // only the current version is kept
+      st.put(data, v.version);
+    } catch (e) { console.error(e); }
+  }
+
+  let loading = null;
+  function load() {
+    loading = loading || (async () => {
+      const v = await version();
+      const hit = await cached(v);
+      if (hit) return hit;
+      const data = await fetchDataset(v);
+      if (v) store(v, data);
+      return data;
+    })().catch(e => { loading = null; throw e; });
+    return loading;
+  }
+
+  // Same shape as projects.rollups.json (build_rollups in setup_showcase.py),
+  // computed from a full dataset for builds without the file and for demos.
+  function summarize(data) {
+    const projects = data.projects || [], classes = data.classes || [];
+    const cube = new Map(), perClass = new Map(classes.map(c => [c.name, { projects: 0, students: new Set() }]));
+    for (const p of projects) {
+      const key = JSON.stringify([p.month || '', p.grade || '', p.tool || '']);
+      cube.set(key, (cube.get(key) || 0) + 1);
+      for (const k of new Set([p.klass, ...(p.alsoIn || [])])) {
+        const c = perClass.get(k);
+        if (c) { c.projects++; c.students.add(p.student); }
+      }
+    }
+    const cmp = (a, b) => a < b ? -1 : a > b ? 1 : 0;
+    return {
+      totals: {
+        projects: projects.length,
+        students: new Set(projects.map(p => p.student)).size,
+        classes: classes.length,
+        months: new Set(projects.map(p => p.month).filter(Boolean)).size
+      },
+      columns: ['month', 'grade', 'tool', 'projects'],
+      counts: Array.from(cube, ([key, n]) => [...JSON.parse(key), n]),
+      classes: classes.map(c => ({ name: c.name, grade: c.grade, capacity: c.count,
+        projects: perClass.get(c.name).projects, students: perClass.get(c.name).students.size })),
+      recent: projects.slice().sort((a, b) => cmp(b.date || '', a.date || '') || cmp(a.id, b.id)).slice(0, 6)
+    };
+  }
+  async function rollups() {
+    const v = await version();
+    if (!v?.rollups) return summarize(await load());
+    const done = span('fetch rollups');
+    const r = await fetchJson(v.rollups);
+    done();
+    return r;
+  }
+
+  // Offline support; skipped on the local dev server so edits always show.
+  if (typeof navigator !== 'undefined' && 'serviceWorker' in navigator &&
+      !['localhost', '127.0.0.1'].includes(location.hostname)) {
+    navigator.serviceWorker.register('sw.js').catch(e => console.error(e));
+  }
+
+  globalThis.ShowcaseData = { load, version, cached, fetchJson, withSearchText, decodeCompact, span, rollups, summarize };
+})();
+""").lstrip("\n")
+
+# ---------- Service worker (sw.js) ----------
+SW_JS = dedent(r"""
+// Generated by setup_showcase.py. Serves the showcase offline:
+// content-hashed files never change, so they are cache-first; version.json is
+// network-first so a new build is noticed on the next load; everything else is
+// stale-while-revalidate.
+const CACHE = 'showcase-v1';
+const HASHED = /\.[0-9a-f]{10}\.json$/;
+
+self.addEventListener('install', () => self.skipWaiting());
+self.addEventListener('activate', event => event.waitUntil(self.clients.claim()));
+
+self.addEventListener('fetch', event => {
+  const req = event.request;
+  const url = new URL(req.url);
+  if (req.method !== 'GET' || url.origin !== location.origin || url.pathname.startsWith('/__')) return;
+  if (HASHED.test(url.pathname)) event.respondWith(cacheFirst(req));
+  else if (url.pathname.endsWith('/version.json')) event.respondWith(networkFirst(req));
+  else event.respondWith(staleWhileRevalidate(event, req));
+});
+
+async function cacheFirst(req) {
+  const cache = await caches.open(CACHE);
+  const hit = await cache.match(req);
+  if (hit) return hit;
+  const res = await fetch(req);
+  if (res.ok) {
+    await cache.put(req, res.clone());
+    pruneOlder(cache, req.url);
+  }
+  return res;
+}
+
+// Drops superseded copies of the same file (projects.<old hash>.json, ...).
+async function pruneOlder(cache, url) {
+  const base = url.replace(HASHED, '');
+  for (const key of await cache.keys()) {
+    if (key.url !== url && HASHED.test(key.url) && key.url.replace(HASHED, '') === base) cache.delete(key);
+  }
+}
+
+async function networkFirst(req) {
+  const cache = await caches.open(CACHE);
+  try {
+    const res = await fetch(req, { cache: 'no-cache' });
+    if (res.ok) await cache.put(req, res.clone());
+    return res;
+  } catch (e) {
+    return (await cache.match(req)) || Response.error();
+  }
+}
 
-    PROJECTS_JSON_PATH.write_text(json.dumps(base, ensure_ascii=False, indent=2), encoding="utf-8")
+async function staleWhileRevalidate(event, req) {
+  const cache = await caches.open(CACHE);
+  const hit = await cache.match(req);
+  const update = fetch(req).then(async res => {
+    if (res.ok) await cache.put(req, res.clone());
+    return res;
+  });
+  if (!hit) return update;
+  event.waitUntil(update.catch(() => {}));
+  return hit;
+}
+""").lstrip("\n")
+
+def write_client_scripts():
+    """Writes showcase-data.js and sw.js when their content changed."""
+    for path, text in ((CLIENT_DATA_JS_PATH, CLIENT_DATA_JS), (SW_PATH, SW_JS)):
+        if not path.exists() or path.read_text(encoding="utf-8") != text:
+            write_text_atomic(path, text)
+
+def write_initial_files(seed_n: int = 0):
+    ensure_dirs()
+
+    # Build class list with derived grade
+    with PROFILE.stage("derive class grades", rows=len(RAW_CLASSES)):
+        classes = []
+        for c in RAW_CLASSES:
+            grade = derive_grade_label(c["name"])
+            classes.append({
+                "name": c["name"],
+                "grade": grade,
+                "count": c["count"],
+                "created": c["created"]
+            })
+
+    # Write index.html, the shared data module and the service worker
+    with PROFILE.stage("write page + scripts"):
+        write_text_atomic(INDEX_HTML_PATH, INDEX_HTML)
+        write_client_scripts()
+
+    # Base projects.json, optionally seeded with N placeholders per class for
+    # quick testing; placeholders are streamed to disk as they are generated
+    meta = {
+        "title": "STEM Tinkercad Showcase – 2025",
+        "updated": str(date.today()),
+        "autoplayMs": 9000
+    }
+    with PROFILE.stage("write projects.json (streamed)") as info:
+        with atomic_writer(PROJECTS_JSON_PATH) as sink:
+            info["rows"] = write_projects_json(sink, meta, classes, iter_placeholder_projects(classes, seed_n))
 
     # Write schema & readme
-    SCHEMA_PATH.write_text(json.dumps(PROJECTS_SCHEMA, ensure_ascii=False, indent=2), encoding="utf-8")
-    README_PATH.write_text(README_MD, encoding="utf-8")
+    with PROFILE.stage("write schema + readme"):
+        write_json_atomic(SCHEMA_PATH, PROJECTS_SCHEMA, indent=2)
+        write_text_atomic(README_PATH, README_MD)
 
     # Write per-class CSV roster templates
-    write_roster_templates(classes)
+    with PROFILE.stage("write roster templates", rows=len(classes)):
+        write_roster_templates(classes)
+
+    # Default tag taxonomy; never overwrites an edited one
+    if not TAG_TAXONOMY_PATH.exists():
+        write_json_atomic(TAG_TAXONOMY_PATH, DEFAULT_TAG_TAXONOMY, indent=2)
 
 def write_roster_templates(classes):
-    headers = ["id","title","student","klass","grade","thumbnail","embedUrl","tags","date"]
+    headers = ROSTER_HEADERS
     for c in classes:
         path = ROSTERS_DIR / f"{normalize_id(c['name'])}.csv"
         if path.exists():
@@ -591,77 +1428,1747 @@ def write_roster_templates(classes):
                 c["name"],
                 c["grade"],
                 "",  # thumbnail (optional)
-                "https://www.tinkercad.com/embed/XXXXXXXXX?autostart=true",
+                PLACEHOLDER_EMBED_URL,
                 "treehouse;architecture",
                 str(date.today())
             ])
 
+# ---------- Profiling (--profile) ----------
+class Profiler:
+    """
+    Per-stage wall time, rows/s and peak traced memory for --profile, plus an
+    optional cProfile dump. Until start() is called, stage() only yields, so
+    the instrumented code costs nothing in normal runs. Memory is traced in
+    this process only (not in --jobs workers).
+    """
+    def __init__(self):
+        self.enabled = False
+        self.stages = []
+        self.cprofile = None
+        self.dump_path = None
+
+    def start(self, dump_path: Path = None):
+        self.enabled = True
+        tracemalloc.start()
+        if dump_path:
+            self.dump_path = dump_path
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    @contextmanager
+    def stage(self, name: str, rows: int = 0):
+        """Times the block; set info["rows"] inside it when the count is known later."""
+        info = {"rows": rows}
+        if not self.enabled:
+            yield info
+            return
+        if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+; earlier peaks are cumulative
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.stages.append((name, time.perf_counter() - start, info["rows"], tracemalloc.get_traced_memory()[1]))
+
+    def report(self):
+        if not self.enabled:
+            return
+        if self.cprofile:
+            self.cprofile.disable()
+            self.cprofile.dump_stats(str(self.dump_path))
+        print(f"[PROFILE] {'stage':<28} {'wall ms':>10} {'rows':>9} {'rows/s':>11} {'peak MB':>9}")
+        for name, wall, rows, peak in self.stages:
+            rate = f"{rows / wall:,.0f}" if rows and wall > 0 else "-"
+            print(f"  {name:<34} {wall * 1000:>10.1f} {rows or '-':>9} {rate:>11} {peak / 1e6:>9.2f}")
+        print(f"  {'total':<34} {sum(s[1] for s in self.stages) * 1000:>10.1f}")
+        if self.cprofile:
+            print(f"[OK] Wrote cProfile stats to {self.dump_path} (top functions by cumulative time below).")
+            pstats.Stats(str(self.dump_path)).sort_stats("cumulative").print_stats(12)
+        tracemalloc.stop()
+        self.enabled = False
+
+PROFILE = Profiler()
+
+# ---------- Build manifest (incremental rebuilds) ----------
+MANIFEST_PATH = DATA_DIR / "build-manifest.json"
+MANIFEST_VERSION = 4
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def load_manifest() -> dict:
+    """
+    Returns the previous build manifest, or an empty one if it is missing,
+    unreadable, or was written by an older manifest format.
+    """
+    try:
+        manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"version": MANIFEST_VERSION, "files": {}}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {"version": MANIFEST_VERSION, "files": {}}
+    return manifest
+
+def save_manifest(manifest: dict):
+    write_json_atomic(MANIFEST_PATH, manifest)
+
+# ---------- Thumbnails (images/ -> images/thumbs/, needs Pillow) ----------
+THUMBS_MANIFEST_PATH = DATA_DIR / "thumbs-manifest.json"
+THUMB_WIDTHS = (240, 480, 960)
+# Tried in order; formats this Pillow build can't encode are skipped.
+# JPEG is the <img> fallback for browsers without AVIF/WebP.
+THUMB_FORMATS = (("avif", "AVIF"), ("webp", "WEBP"), ("jpeg", "JPEG"))
+IMAGE_EXTS = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".bmp"}
+
+def make_thumbnails(src: Path, digest: str) -> dict:
+    """
+    Writes resized variants of one image, named <hash>-<width>.<ext>, and returns
+    {"width", "height", "srcset": {fmt: "url 240w, ..."}} for the project data.
+    Images are never upscaled.
+    """
+    Image.init()
+    with Image.open(src) as im:
+        im.load()
+        width, height = im.size
+        widths = sorted({min(w, width) for w in THUMB_WIDTHS})
+        srcset = {}
+        for ext, fmt in THUMB_FORMATS:
+            if fmt not in Image.SAVE:
+                continue
+            entries = []
+            for w in widths:
+                out = THUMBS_DIR / f"{digest}-{w}.{ext}"
+                if not out.exists():
+                    h = max(1, round(height * w / width))
+                    resized = im.resize((w, h), Image.LANCZOS)
+                    if fmt == "JPEG":
+                        resized = resized.convert("RGB")
+                    resized.save(out, fmt, quality=70)
+                entries.append(f"{out.relative_to(ROOT).as_posix()} {w}w")
+            srcset[ext] = ", ".join(entries)
+    return {"width": width, "height": height, "srcset": srcset}
+
+def thumb_files(info: dict) -> set:
+    """Returns the variant paths (relative to ROOT) referenced by a thumb info."""
+    return {part.split(" ")[0] for srcset in info["srcset"].values() for part in srcset.split(", ")}
+
+def build_thumbnails() -> dict:
+    """
+    Scans IMAGES_DIR and returns {"images/<name>": thumb info}. Results are cached
+    by content hash in the thumbnails manifest, so unchanged images are not
+    decoded again; variants no longer referenced are deleted.
+    """
+    if Image is None:
+        print("[WARN] Pillow is not installed; skipping thumbnails (pip install Pillow).")
+        return {}
+    THUMBS_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        cache = json.loads(THUMBS_MANIFEST_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        cache = {}
+    by_hash = {e["sha256"]: e["info"] for e in cache.values()}
+
+    images = {}
+    entries = {}
+    made = 0
+    for src in sorted(IMAGES_DIR.rglob("*")):
+        if not src.is_file() or src.suffix.lower() not in IMAGE_EXTS or THUMBS_DIR in src.parents:
+            continue
+        rel = src.relative_to(ROOT).as_posix()
+        st = src.stat()
+        entry = cache.get(rel)
+        fresh = entry and (entry["mtime"], entry["size"]) == (st.st_mtime_ns, st.st_size)
+        if not (fresh and all((ROOT / f).exists() for f in thumb_files(entry["info"]))):
+            digest = file_sha256(src)[:16]
+            info = by_hash.get(digest)
+            if info is None or not all((ROOT / f).exists() for f in thumb_files(info)):
+                try:
+                    info = make_thumbnails(src, digest)
+                except OSError as e:
+                    print(f"[WARN] {rel}: could not make thumbnails ({e}).")
+                    continue
+                made += 1
+            entry = {"sha256": digest, "info": info}
+        entry["mtime"] = st.st_mtime_ns
+        entry["size"] = st.st_size
+        entries[rel] = entry
+        images[rel] = entry["info"]
+
+    keep = set().union(*(thumb_files(info) for info in images.values()))
+    for f in THUMBS_DIR.iterdir():
+        if f.relative_to(ROOT).as_posix() not in keep:
+            f.unlink()
+    write_json_atomic(THUMBS_MANIFEST_PATH, entries)
+    print(f"[OK] Thumbnails: {len(images)} images, {made} processed, {len(images) - made} cached.")
+    return images
+
+def with_thumbnails(projects: list, images: dict) -> list:
+    """Returns projects with srcset/width/height added where the thumbnail is in images/."""
+    out = []
+    for p in projects:
+        rel = p["thumbnail"][2:] if p["thumbnail"].startswith("./") else p["thumbnail"]
+        info = images.get(rel)
+        if info:
+            p = dict(p, thumbSrcset=info["srcset"], thumbWidth=info["width"], thumbHeight=info["height"])
+        out.append(p)
+    return out
+
+# ---------- Content-hashed outputs (version.json) ----------
+HASHED_SUFFIX_RE = r"\.[0-9a-f]{10}\.json"
+
+def write_hashed(path: Path, write) -> str:
+    """
+    Streams `write(sink)` into <stem>.<hash>.json beside `path`, removes older
+    hashed copies of it, and returns the new name relative to ROOT.
+    """
+    with atomic_writer(path, hashed=True) as sink:
+        write(sink)
+    target = sink.path
+    older = re.compile(re.escape(path.stem) + HASHED_SUFFIX_RE)
+    for old in path.parent.glob(f"{path.stem}.*.json"):
+        if old != target and older.fullmatch(old.name):
+            old.unlink()
+    return target.relative_to(ROOT).as_posix()
+
+def read_version() -> dict:
+    try:
+        return json.loads(VERSION_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+PUBLISHED_KEYS = ("data", "index", "search", "compact", "rollups")
+
+def write_version(output_hash: str, meta: dict, files: dict):
+    """
+    Writes version.json, the small pointer the page revalidates on each load:
+    {version, updated, data?, index?, compact?, search, rollups} naming the
+    current hashed files. Returns it.
+    """
+    version = {"version": output_hash[:10], "updated": meta.get("updated", "")}
+    version.update({k: v for k, v in files.items() if v})
+    write_json_atomic(VERSION_PATH, version, indent=2)
+    print(f"[OK] Wrote {VERSION_PATH} (version {version['version']}).")
+    return version
+
+def prune_outputs(version: dict):
+    """
+    Deletes generated files version.json no longer points at: hashed copies
+    of projects / index / search / rollups / compact and shards/*.json, so
+    switching layouts (dropping --shard or --compact) leaves nothing behind.
+    Plain names such as projects.json are left alone.
+    """
+    keep = {ROOT / version[k] for k in PUBLISHED_KEYS if version.get(k)}
+    if version.get("index"):
+        index = json.loads((ROOT / version["index"]).read_text(encoding="utf-8"))
+        keep.update(ROOT / s["file"] for s in index["shards"])
+    generated = [*SHARDS_DIR.glob("*.json")]
+    for path in (PROJECTS_JSON_PATH, PROJECTS_INDEX_PATH, SEARCH_INDEX_PATH, ROLLUPS_PATH, PROJECTS_COMPACT_PATH):
+        hashed = re.compile(re.escape(path.stem) + HASHED_SUFFIX_RE)
+        generated.extend(p for p in ROOT.glob(f"{path.stem}.*.json") if hashed.fullmatch(p.name))
+    stale = [p for p in generated if p not in keep]
+    for p in stale:
+        p.unlink()
+    if SHARDS_DIR.exists() and not any(SHARDS_DIR.iterdir()):
+        SHARDS_DIR.rmdir()
+    if stale:
+        print(f"[OK] Removed {len(stale)} unreferenced output file(s).")
+
+# ---------- Sharded output (projects.index.json + shards/*.json) ----------
+def write_shards(meta: dict, classes: list, projects: list, shard_by: str) -> str:
+    """
+    Writes one content-hashed shard per class or grade plus a small index the
+    page reads first, and returns the index name. Shards are listed in
+    first-seen order; prune_outputs() removes the ones no longer listed.
+    """
+    field = "klass" if shard_by == "class" else "grade"
+    groups = {}
+    for p in projects:
+        groups.setdefault(p[field], []).append(p)
+
+    SHARDS_DIR.mkdir(parents=True, exist_ok=True)
+    shards = []
+    for key, items in groups.items():
+        path = SHARDS_DIR / f"{normalize_id(key) or 'other'}.json"
+        name = write_hashed(path, lambda sink: write_json_stream(sink, {"key": key, "projects": items}))
+        path = ROOT / name
+        shards.append({
+            "file": f"{SHARDS_DIR.name}/{path.name}",
+            "key": key,
+            "grades": sorted({p["grade"] for p in items}),
+            "classes": sorted({k for p in items for k in [p["klass"], *p.get("alsoIn", [])]}),
+            "count": len(items)
+        })
+
+    counts = {"total": len(projects), "grades": {}, "classes": {}}
+    for p in projects:
+        counts["grades"][p["grade"]] = counts["grades"].get(p["grade"], 0) + 1
+        counts["classes"][p["klass"]] = counts["classes"].get(p["klass"], 0) + 1
+    index = {
+        "meta": meta,
+        "classes": classes,
+        "counts": counts,
+        "shardBy": shard_by,
+        "shards": shards
+    }
+    name = write_hashed(PROJECTS_INDEX_PATH, lambda sink: sink.write(json.dumps(index, ensure_ascii=False, indent=2)))
+    print(f"[OK] Wrote {ROOT / name} and {len(shards)} shards by {shard_by}.")
+    return name
+
+# ---------- Search index (projects.search.json) ----------
+SEARCH_TOKEN_RE = re.compile(r"[^\W_]+")
+
+def sort_orders(projects: list) -> dict:
+    """
+    Project ordinals for each sort key of the page's sort menu. Ties are broken
+    by id (then output position), so the order is the same on every build.
+    """
+    by_id = sorted(range(len(projects)), key=lambda n: projects[n]["id"])
+    def order(field, reverse=False, fold=False):
+        key = (lambda n: projects[n][field].casefold()) if fold else (lambda n: projects[n][field])
+        return sorted(by_id, key=key, reverse=reverse)  # stable: ties keep id order
+    return {
+        "date-asc": order("date"),
+        "date-desc": order("date", reverse=True),
+        "title-asc": order("title", fold=True),
+        "student-asc": order("student", fold=True)
+    }
+
+def write_search_index(projects: list) -> str:
+    """
+    Writes a content-hashed inverted index over title, student, tags and class.
+    Tokens are sorted so the page can binary-search them for prefix lookups;
+    postings hold ordinals into `ids` (the projects in output order), and
+    `orders` lists those ordinals presorted for each sort in the page.
+    """
+    postings = {}
+    for n, p in enumerate(projects):
+        text = " ".join([p["title"], p["student"], " ".join(p["tags"]), p["klass"]]).lower()
+        for tok in set(SEARCH_TOKEN_RE.findall(text)):
+            postings.setdefault(tok, []).append(n)
+    tokens = sorted(postings)
+    index = {
+        "ids": [p["id"] for p in projects],
+        "tokens": tokens,
+        "postings": [postings[t] for t in tokens],
+        "orders": sort_orders(projects)
+    }
+    name = write_hashed(SEARCH_INDEX_PATH, lambda sink: write_json_stream(sink, index))
+    print(f"[OK] Wrote {ROOT / name} ({len(tokens)} tokens).")
+    return name
+
+# ---------- Rollups (projects.rollups.json) ----------
+ROLLUPS_FORMAT = "showcase-rollups/1"
+RECENT_PROJECTS = 6
+RECENT_FIELDS = ("id", "title", "student", "klass", "grade", "month", "tool", "tags", "date")
+
+def build_rollups(meta: dict, classes: list, projects: list) -> dict:
+    """
+    The counts the summary pages (home, curriculum) show, so they don't need
+    every project: projects per (month, grade, tool), submissions per class
+    against its RAW_CLASSES `count`, totals and the newest few projects.
+    Month and tool are "" for rows from 9-column rosters. summarize() in
+    showcase-data.js builds the same shape from a full dataset.
+    """
+    cube = {}
+    per_class = {c["name"]: [0, set()] for c in classes}
+    for p in projects:
+        key = (p.get("month", ""), p["grade"], p.get("tool", ""))
+        cube[key] = cube.get(key, 0) + 1
+        for k in {p["klass"], *p.get("alsoIn", [])}:
+            if k in per_class:
+                per_class[k][0] += 1
+                per_class[k][1].add(p["student"])
+    recent = [projects[n] for n in sort_orders(projects)["date-desc"][:RECENT_PROJECTS]]
+    return {
+        "format": ROLLUPS_FORMAT,
+        "updated": meta.get("updated", ""),
+        "totals": {
+            "projects": len(projects),
+            "students": len({p["student"] for p in projects}),
+            "classes": len(classes),
+            "months": len({p.get("month", "") for p in projects} - {""})
+        },
+        "columns": ["month", "grade", "tool", "projects"],
+        "counts": [[*key, n] for key, n in sorted(cube.items())],
+        "classes": [{"name": c["name"], "grade": c["grade"], "capacity": c["count"],
+                     "projects": per_class[c["name"]][0], "students": len(per_class[c["name"]][1])}
+                    for c in classes],
+        "recent": [{k: p[k] for k in RECENT_FIELDS if k in p} for p in recent]
+    }
+
+def write_rollups(meta: dict, classes: list, projects: list) -> str:
+    rollups = build_rollups(meta, classes, projects)
+    text = json.dumps(rollups, ensure_ascii=False, separators=(",", ":"))
+    name = write_hashed(ROLLUPS_PATH, lambda sink: sink.write(text))
+    print(f"[OK] Wrote {ROOT / name} ({len(rollups['counts'])} month/grade/tool rows, "
+          f"{len(text.encode('utf-8')) / 1024:.1f} KB).")
+    return name
+
+# ---------- Compact payload (projects.compact.json) ----------
+COMPACT_FORMAT = "showcase-compact/2"
+EMBED_PREFIX = "https://www.tinkercad.com/embed/"
+EMBED_SUFFIX = "?autostart=true"
+COMPACT_FIELDS = ("id", "title", "student", "klass", "grade", "thumbnail", "embedUrl", "tags", "date")
+
+def encode_compact(meta: dict, classes: list, projects: list) -> dict:
+    """
+    Stores projects column-wise: klass, grade and tags become indexes into
+    lookup tables and embedUrl is cut down to the Tinkercad id when it has the
+    usual prefix/suffix. Other URLs are kept whole and their rows listed in
+    embedWhole, so the decoder never has to guess which is which. Any other fields (month,
+    tool, thumbnail srcset, ...) become plain columns with null where a
+    project lacks them. The page's decodeCompact() rebuilds the same objects.
+    """
+    lookups = {"klasses": {}, "grades": {}, "tags": {}}
+    def ref(table, value):
+        return lookups[table].setdefault(value, len(lookups[table]))
+
+    extra = []
+    for p in projects:
+        extra.extend(k for k in p if k not in COMPACT_FIELDS and k not in extra)
+    names = ["id", "title", "student", "klass", "grade", "thumbnail", "embed", "tags", "date"] + extra
+    columns = {k: [] for k in names}
+    whole = []
+    for i, p in enumerate(projects):
+        url = p["embedUrl"]
+        if (len(url) >= len(EMBED_PREFIX) + len(EMBED_SUFFIX)
+                and url.startswith(EMBED_PREFIX) and url.endswith(EMBED_SUFFIX)):
+            embed = url[len(EMBED_PREFIX):len(url) - len(EMBED_SUFFIX)]
+        else:
+            embed = url
+            whole.append(i)
+        columns["id"].append(p["id"])
+        columns["title"].append(p["title"])
+        columns["student"].append(p["student"])
+        columns["klass"].append(ref("klasses", p["klass"]))
+        columns["grade"].append(ref("grades", p["grade"]))
+        columns["thumbnail"].append(p["thumbnail"])
+        columns["embed"].append(embed)
+        columns["tags"].append([ref("tags", t) for t in p["tags"]])
+        columns["date"].append(p["date"])
+        for k in extra:
+            columns[k].append(p.get(k))
+    return {
+        "format": COMPACT_FORMAT,
+        "meta": meta,
+        "classes": classes,
+        "klasses": list(lookups["klasses"]),
+        "grades": list(lookups["grades"]),
+        "tags": list(lookups["tags"]),
+        "embedPrefix": EMBED_PREFIX,
+        "embedSuffix": EMBED_SUFFIX,
+        "embedWhole": whole,
+        "count": len(projects),
+        "extra": extra,
+        "columns": columns
+    }
+
+def write_compact(data: dict) -> str:
+    """Writes the content-hashed compact payload and reports its size against projects.json."""
+    payload = encode_compact(data["meta"], data["classes"], data["projects"])
+    name = write_hashed(PROJECTS_COMPACT_PATH, lambda sink: write_json_stream(sink, payload))
+    measured = [measure_json(data), measure_json(payload)]
+    sizes = [m.size for m in measured]
+    gz = [m.gz_size for m in measured]
+    def change(new, old):
+        saved = 1 - new / max(old, 1)
+        return f"{saved:.0%} smaller" if saved >= 0 else f"{-saved:.0%} larger"
+    print(f"[OK] Wrote {ROOT / name}: {sizes[1] / 1024:.1f} KB vs {sizes[0] / 1024:.1f} KB for minified "
+          f"projects.json ({change(*sizes[::-1])}); gzip {gz[1] / 1024:.1f} KB vs "
+          f"{gz[0] / 1024:.1f} KB ({change(*gz[::-1])}).")
+    return name
+
+# ---------- Validation (compiled from PROJECTS_SCHEMA) ----------
+BUILD_REPORT_PATH = DATA_DIR / "build-report.json"
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+JSON_TYPES = {"string": str, "number": (int, float), "array": list, "object": dict}
+MAX_PRINTED_PROBLEMS = 10
+
+def problem(severity, code, file, line, id_, field, message) -> dict:
+    return {"severity": severity, "code": code, "file": file, "line": line,
+            "id": id_, "field": field, "message": message}
+
+def compile_project_validator(schema: dict = PROJECTS_SCHEMA):
+    """
+    Compiles the project item schema once into flat per-field checks.
+    Returns validate(row) -> [(code, field, message)] covering required fields,
+    JSON types, date format, known class and grade/class consistency.
+    """
+    item = schema["properties"]["projects"]["items"]
+    required = tuple(item["required"])
+    typed = tuple(
+        (field, JSON_TYPES[spec["type"]], JSON_TYPES.get(spec.get("items", {}).get("type")))
+        for field, spec in item["properties"].items()
+    )
+    class_grades = {c["name"]: derive_grade_label(c["name"]) for c in RAW_CLASSES}
+
+    def validate(row: dict) -> list:
+        errors = [("required", f, f"{f} is required") for f in required if not row.get(f)]
+        for field, typ, item_typ in typed:
+            value = row.get(field)
+            if value is None:
+                continue
+            if not isinstance(value, typ):
+                errors.append(("type", field, f"{field} must be {typ.__name__ if isinstance(typ, type) else 'number'}"))
+            elif item_typ and not all(isinstance(v, item_typ) for v in value):
+                errors.append(("type", field, f"every {field} item must be {item_typ.__name__}"))
+        dt = row.get("date")
+        if dt:
+            try:
+                if not DATE_RE.match(dt):
+                    raise ValueError
+                date.fromisoformat(dt)
+            except (TypeError, ValueError):
+                errors.append(("date", "date", f"date {dt!r} is not YYYY-MM-DD"))
+        klass = row.get("klass")
+        if klass:
+            if klass not in class_grades:
+                errors.append(("unknown-class", "klass", f"class {klass!r} is not in RAW_CLASSES"))
+            elif row.get("grade") != class_grades[klass]:
+                errors.append(("grade-mismatch", "grade",
+                               f"grade {row.get('grade')!r} does not match {klass!r} ({class_grades[klass]})"))
+        return errors
+
+    return validate
+
+def validate_rosters(files: dict):
+    """
+    One pass over every parsed roster, in file order.
+    Returns (projects, problems). Rows missing a required field are left out
+    (as before); every other problem is reported but the row is kept.
+    Duplicate ids are checked across all rosters.
+    """
+    validate = compile_project_validator()
+    projects = []
+    problems = []
+    seen = {}
+    for name, entry in files.items():
+        problems.extend(entry["problems"])
+        for row, line in zip(entry["rows"], entry["lines"]):
+            id_ = row.get("id") or None
+            errors = validate(row)
+            if id_:
+                key = normalize_id(id_)  # "Ava_1" and "ava-1" would share a URL slug
+                if key in seen:
+                    errors.append(("duplicate-id", "id", f"id {id_!r} already used at {seen[key]}"))
+                else:
+                    seen[key] = f"{name}:{line}"
+            for code, field, message in errors:
+                problems.append(problem("error", code, name, line, id_, field, message))
+            embed = row.get("embedUrl")
+            if embed and "tinkercad.com/embed/" not in embed:
+                problems.append(problem("warning", "not-embed", name, line, id_, "embedUrl",
+                                        "embedUrl is not a Tinkercad EMBED link"))
+            if not any(code == "required" for code, _, _ in errors):
+                projects.append(row)
+    return projects, problems
+
+def write_build_report(problems: list, rows_skipped: int, rows_merged: int = 0) -> dict:
+    """
+    Writes the machine-readable report and prints a short summary.
+    rows_skipped counts rows validation dropped; rows_merged counts duplicate
+    copies folded into another project by --merge-duplicates.
+    """
+    n_errors = sum(1 for p in problems if p["severity"] == "error")
+    report = {
+        "ok": n_errors == 0,
+        "errors": n_errors,
+        "warnings": len(problems) - n_errors,
+        "rowsSkipped": rows_skipped,
+        "rowsMerged": rows_merged,
+        "byCode": {},
+        "problems": problems
+    }
+    for p in problems:
+        key = f"{p['severity']}:{p['code']}"
+        report["byCode"][key] = report["byCode"].get(key, 0) + 1
+    write_json_atomic(BUILD_REPORT_PATH, report, indent=2)
+
+    if problems:
+        merged = f", {rows_merged} duplicate rows merged" if rows_merged else ""
+        print(f"[WARN] {n_errors} errors, {report['warnings']} warnings; {rows_skipped} incomplete rows skipped"
+              f"{merged}. Report: {BUILD_REPORT_PATH}")
+        for key, n in sorted(report["byCode"].items()):
+            print(f"  {key}: {n}")
+        # errors first, each group in file order
+        for p in sorted(problems, key=lambda p: p["severity"] != "error")[:MAX_PRINTED_PROBLEMS]:
+            where = f"{p['file']}:{p['line']}" + (f" id={p['id']}" if p["id"] else "")
+            print(f"  [{p['severity'].upper()}] {where}: {p['message']}")
+        if len(problems) > MAX_PRINTED_PROBLEMS:
+            print(f"  … and {len(problems) - MAX_PRINTED_PROBLEMS} more in the report.")
+    return report
+
+# ---------- Tag inference (data/tag-taxonomy.json) ----------
+DEFAULT_TAG_TAXONOMY = {
+    "treehouse": ["tree", "house"],
+    "space": ["rocket", "mars"],
+    "circuits": ["circuit", "wire", "simulate", "components"]
+}
+
+class TagMatcher:
+    """
+    Tags titles from a {tag: [keyword, ...]} taxonomy. Keywords match
+    case-insensitively anywhere in the title. They are compiled once into a
+    single Aho-Corasick automaton, so each title is tagged in one scan whose
+    cost does not grow with the number of keywords. Tags come out in taxonomy
+    order. With count, hits per tag are kept in `counts`.
+    """
+    def __init__(self, taxonomy: dict, count: bool = False):
+        self.taxonomy = taxonomy
+        self.order = {tag: n for n, tag in enumerate(taxonomy)}
+        goto, out = [{}], [set()]
+        for tag, keywords in taxonomy.items():
+            for kw in keywords:
+                state = 0
+                for ch in kw.casefold():
+                    if ch not in goto[state]:
+                        goto[state][ch] = len(goto)
+                        goto.append({})
+                        out.append(set())
+                    state = goto[state][ch]
+                if state:
+                    out[state].add(tag)
+        # failure links, breadth first; each state also reports the tags of
+        # the keywords that end inside it
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] |= out[fail[nxt]]
+                queue.append(nxt)
+        self.goto, self.fail = goto, fail
+        self.out = [frozenset(o) for o in out]
+        self.counts = Counter() if count else None
+        self.titles = 0
+
+    def tags(self, title: str) -> list:
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        found = set()
+        for ch in title.casefold():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found |= out[state]
+        tags = sorted(found, key=self.order.__getitem__)
+        if self.counts is not None:
+            self.titles += 1
+            self.counts.update(tags)
+        return tags
+
+    def report(self):
+        hits = ", ".join(f"{tag} {n}" for tag, n in self.counts.most_common()) or "none"
+        print(f"[STATS] auto-tags over {self.titles} titles: {hits}")
+
+def load_tag_taxonomy(path: Path = None) -> dict:
+    """Reads data/tag-taxonomy.json, or the built-in default when there is none."""
+    path = path or TAG_TAXONOMY_PATH
+    if not path.exists():
+        return DEFAULT_TAG_TAXONOMY
+    try:
+        taxonomy = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        sys.exit(f"[FAIL] {path}: {e}")
+    if not (isinstance(taxonomy, dict) and all(
+            isinstance(kws, list) and all(isinstance(k, str) and k for k in kws) for kws in taxonomy.values())):
+        sys.exit(f'[FAIL] {path} must map each tag to a list of keywords, e.g. {{"space": ["rocket", "mars"]}}')
+    return taxonomy
+
+def auto_tag(projects: list, matcher: TagMatcher) -> list:
+    """
+    Adds inferred tags after a project's own ones. Tagged projects are
+    copies, so the rows cached in the build manifest stay as parsed.
+    """
+    tagged = []
+    for p in projects:
+        extra = [t for t in matcher.tags(p["title"]) if t not in p["tags"]]
+        tagged.append(dict(p, tags=p["tags"] + extra) if extra else p)
+    return tagged
+
+# ---------- Identity index (cross-roster duplicates) ----------
+IDENTITY_INDEX_PATH = DATA_DIR / "identity-index.json"
+IDENTITY_INDEX_VERSION = 2
+
+def work_key(row: dict) -> str:
+    """Normalized title + student: the same work even when ids and classes differ."""
+    return f"{normalize_id(row.get('title') or '')}|{normalize_id(row.get('student') or '')}"
+
+def load_identity_index() -> dict:
+    try:
+        index = json.loads(IDENTITY_INDEX_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return index if index.get("version") == IDENTITY_INDEX_VERSION else {}
+
+def resolve_identities(files: dict, projects: list, merge: bool = False):
+    """
+    Groups projects across all rosters by work_key in one pass. The work keys
+    of each roster are kept in data/identity-index.json with the roster's
+    sha256, so only rosters whose content changed are re-keyed; the others
+    reuse their stored keys. The canonical copy of a work is the one the
+    previous build picked while it still exists, otherwise the first in file
+    order, so identity stays stable as rosters change. Other copies are
+    reported as duplicate-work warnings; with merge they are dropped and their
+    classes are listed in the canonical project's `alsoIn`. Rows still using
+    the placeholder embed are ignored. Returns (projects, problems) and writes
+    the updated index.
+    """
+    origin = {}
+    for name, entry in files.items():
+        for row, line in zip(entry["rows"], entry["lines"]):
+            origin[id(row)] = f"{name}:{line}"
+    at = {origin[id(p)]: p for p in projects}
+
+    previous = load_identity_index()
+    stored = previous.get("rosters", {})
+    rosters = {}
+    groups = {}
+    for name, entry in files.items():
+        keyed = stored.get(name)
+        if not keyed or keyed["sha256"] != entry["sha256"] or \
+                any(f"{name}:{line}" not in at for line, _ in keyed["keys"]):
+            keyed = {"sha256": entry["sha256"], "keys": [
+                [line, work_key(row)] for row, line in zip(entry["rows"], entry["lines"])
+                if f"{name}:{line}" in at and row.get("embedUrl") != PLACEHOLDER_EMBED_URL]}
+        rosters[name] = keyed
+        for line, key in keyed["keys"]:
+            groups.setdefault(key, []).append(at[f"{name}:{line}"])
+
+    chosen = previous.get("works", {})
+    works = {}
+    replaced = {}
+    dropped = set()
+    problems = []
+    for key, group in groups.items():
+        canonical = next((p for p in group if p["id"] == chosen.get(key)), group[0])
+        works[key] = canonical["id"]
+        also_in = []
+        for p in group:
+            if p is canonical:
+                continue
+            name, _, line = origin[id(p)].rpartition(":")
+            problems.append(problem("warning", "duplicate-work", name, int(line), p["id"] or None, "title",
+                                    f"same title and student as {canonical['id']!r} at {origin[id(canonical)]}"
+                                    + ("; merged" if merge else "")))
+            if merge:
+                dropped.add(id(p))
+                if p["klass"] != canonical["klass"] and p["klass"] not in also_in:
+                    also_in.append(p["klass"])
+        if also_in:
+            # a copy, so the rows cached in the build manifest stay as parsed
+            replaced[id(canonical)] = dict(canonical, alsoIn=also_in)
+
+    write_json_atomic(IDENTITY_INDEX_PATH, {"version": IDENTITY_INDEX_VERSION, "rosters": rosters, "works": works})
+    if merge:
+        projects = [replaced.get(id(p), p) for p in projects if id(p) not in dropped]
+    return projects, problems
+
+# ---------- Embed health check (--check-embeds) ----------
+EMBED_CACHE_PATH = DATA_DIR / "embed-cache.json"
+EMBED_CACHE_TTL = 7 * 24 * 3600  # seconds before a cached result is checked again
+EMBED_CONCURRENCY = 8            # requests in flight (worker threads)
+EMBED_HOST_INTERVAL = 0.25       # seconds between requests to the same host
+EMBED_TIMEOUT = 10
+
+def rebase_url(url: str, base: str = None) -> str:
+    """
+    Moves url onto base (scheme://host[:port][/prefix]) as
+    <base>/<original host><path>?<query>, so embeds on different hosts stay
+    distinct URLs (and cache entries) on the stand-in.
+    """
+    if not base:
+        return url
+    parts, b = urlsplit(url), urlsplit(base)
+    return urlunsplit((b.scheme, b.netloc, f"{b.path.rstrip('/')}/{parts.netloc}{parts.path}", parts.query, ""))
+
+def fetch_embed_status(url: str) -> tuple:
+    """
+    Returns (state, code, detail) for one URL; runs in a worker thread.
+    state is "ok", "broken" (4xx: missing or private) or "error" (network
+    trouble, 5xx or 429), which is not cached so the next build retries it.
+    """
+    try:
+        with urlopen(Request(url, headers={"User-Agent": "showcase-embed-check/1"}), timeout=EMBED_TIMEOUT) as resp:
+            resp.read(1024)
+            return "ok", resp.status, ""
+    except HTTPError as e:
+        return ("broken" if 400 <= e.code < 500 and e.code != 429 else "error"), e.code, str(e.reason)
+    except (URLError, OSError, ValueError) as e:
+        return "error", None, str(getattr(e, "reason", e))
+
+async def check_urls(urls: list) -> dict:
+    """
+    Checks urls concurrently: at most EMBED_CONCURRENCY in flight and at least
+    EMBED_HOST_INTERVAL seconds between starts against any one host.
+    """
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(EMBED_CONCURRENCY)
+    next_start = {}
+
+    async def check(url):
+        async with slots:
+            host = urlsplit(url).netloc
+            now = loop.time()
+            start = max(now, next_start.get(host, now))
+            next_start[host] = start + EMBED_HOST_INTERVAL
+            if start > now:
+                await asyncio.sleep(start - now)
+            return url, await loop.run_in_executor(pool, fetch_embed_status, url)
+
+    with ThreadPoolExecutor(max_workers=EMBED_CONCURRENCY) as pool:
+        return dict(await asyncio.gather(*(check(u) for u in urls)))
+
+def load_embed_cache() -> dict:
+    """Returns {url: {state, code, checked}} without entries older than the TTL."""
+    try:
+        cache = json.loads(EMBED_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {u: r for u, r in cache.items() if now - r.get("checked", 0) < EMBED_CACHE_TTL}
+
+def check_embed_urls(files: dict, base: str = None) -> list:
+    """
+    Verifies every unique embed URL in the parsed rosters, reusing cached
+    results, and returns embed-broken / embed-unreachable warnings (one per
+    row) for the build report. Template rows still holding
+    PLACEHOLDER_EMBED_URL are counted but never fetched. With base, URLs are
+    checked against that server instead (e.g. a local stand-in).
+    """
+    where = {}
+    placeholders = 0
+    for name, entry in files.items():
+        for row, line in zip(entry["rows"], entry["lines"]):
+            url = row.get("embedUrl") or ""
+            if url == PLACEHOLDER_EMBED_URL:
+                placeholders += 1
+            elif url.startswith(("http://", "https://")):
+                where.setdefault(rebase_url(url, base), []).append((name, line, row.get("id") or None))
+
+    cache = load_embed_cache()
+    todo = [u for u in where if u not in cache]
+    start = time.perf_counter()
+    results = asyncio.run(check_urls(todo)) if todo else {}
+    now = time.time()
+    for url, (state, code, _) in results.items():
+        if state != "error":
+            cache[url] = {"state": state, "code": code, "checked": now}
+    write_json_atomic(EMBED_CACHE_PATH, cache, indent=2)
+
+    problems = []
+    counts = {"ok": 0, "broken": 0, "error": 0}
+    for url, places in where.items():
+        state, code, detail = results.get(url) or (cache[url]["state"], cache[url]["code"], "")
+        counts[state] += 1
+        if state == "ok":
+            continue
+        if state == "broken":
+            code_name, message = "embed-broken", f"embed returned HTTP {code}: {url}"
+        else:
+            code_name, message = "embed-unreachable", f"embed could not be checked ({detail or code}): {url}"
+        for name, line, id_ in places:
+            problems.append(problem("warning", code_name, name, line, id_, "embedUrl", message))
+    print(f"[OK] Embeds: {len(where)} unique, {len(todo)} checked in {time.perf_counter() - start:.1f}s "
+          f"({len(where) - len(todo)} cached): {counts['ok']} ok, {counts['broken']} broken, "
+          f"{counts['error']} unreachable; {placeholders} placeholder row(s) skipped.")
+    return problems
+
 # ---------- Build projects.json from rosters/*.csv ----------
-def build_json_from_rosters():
+def output_digest(classes: list, projects: list, shard_by, combined: bool, compact: bool) -> str:
+    """
+    Hashes only classes + projects (and the output layout) so a new date alone
+    doesn't force a rewrite; projects are hashed one at a time.
+    """
+    h = hashlib.sha256(json.dumps([classes, shard_by, combined, compact], ensure_ascii=False,
+                                  sort_keys=True).encode("utf-8"))
+    for p in projects:
+        h.update(json.dumps(p, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+def write_outputs(meta: dict, classes: list, projects: list, output_hash: str,
+                  shard_by=None, combined: bool = True, compact: bool = False):
+    """Writes projects.json, compact payload, shards and search index, then version.json."""
+    hashed = {}
+    n = len(projects)
+    if combined:
+        # streamed once into projects.json, then copied to its hashed name
+        with PROFILE.stage("write projects.json (streamed)", rows=n):
+            with atomic_writer(PROJECTS_JSON_PATH) as sink:
+                write_projects_json(sink, meta, classes, projects)
+            with PROJECTS_JSON_PATH.open(encoding="utf-8", newline="") as src:
+                hashed["data"] = write_hashed(PROJECTS_JSON_PATH, lambda out: shutil.copyfileobj(src, out))
+        print(f"[OK] Wrote {PROJECTS_JSON_PATH} with {n} projects (+ {hashed['data']}).")
+    if compact:
+        with PROFILE.stage("compact payload", rows=n):
+            hashed["compact"] = write_compact({"meta": meta, "classes": classes, "projects": projects})
+    if shard_by:
+        with PROFILE.stage("shards", rows=n):
+            hashed["index"] = write_shards(meta, classes, projects, shard_by)
+    with PROFILE.stage("search index", rows=n):
+        hashed["search"] = write_search_index(projects)
+    with PROFILE.stage("rollups", rows=n):
+        hashed["rollups"] = write_rollups(meta, classes, projects)
+    prune_outputs(write_version(output_hash, meta, hashed))
+
+def parse_roster(csv_path: Path):
+    """
+    Parses one roster CSV into project rows; nothing is dropped here.
+    Returns (projects, lines, problems): the CSV line of each row and any
+    file-level problems (e.g. unexpected columns) for the build report.
+    """
+    projects = []
+    lines = []
+    problems = []
+    with csv_path.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        # Validate header
+        if reader.fieldnames not in (ROSTER_HEADERS, CURRICULUM_HEADERS):
+            problems.append(problem("warning", "header", csv_path.name, 1, None, None,
+                                    f"unexpected columns. Expected {ROSTER_HEADERS} or {CURRICULUM_HEADERS} "
+                                    f"got {reader.fieldnames}"))
+        curriculum = {"month", "tool"} <= set(reader.fieldnames or [])
+        for row in reader:
+            klass = (row.get("klass") or "").strip()
+            project = {
+                "id": (row.get("id") or "").strip(),
+                "title": (row.get("title") or "").strip(),
+                "student": (row.get("student") or "").strip(),
+                "klass": klass,
+                "grade": (row.get("grade") or "").strip() or derive_grade_label(klass)
+            }
+            if curriculum:
+                project["month"] = (row.get("month") or "").strip().lower()
+                project["tool"] = (row.get("tool") or "").strip()
+            project.update({
+                "thumbnail": (row.get("thumbnail") or "").strip(),
+                "embedUrl": (row.get("embedUrl") or "").strip(),
+                "tags": [t.strip() for t in (row.get("tags") or "").replace(",", ";").split(";") if t.strip()],
+                "date": (row.get("date") or "").strip()
+            })
+            projects.append(project)
+            lines.append(reader.line_num)
+    return projects, lines, problems
+
+def build_json_from_rosters(stats: bool = False, jobs: int = 1, shard_by: str = None, combined: bool = True,
+                            thumbnails: bool = False, strict: bool = False, compact: bool = False,
+                            check_embeds: bool = False, embed_base: str = None, merge_duplicates: bool = False,
+                            store: bool = False, prerender: bool = False, auto_tags: bool = False,
+                            tag_stats: bool = False):
+    """
+    Builds projects.json from rosters/*.csv.
+
+    Parsed rows are cached per roster in the build manifest, keyed by mtime/size
+    and content hash, so only rosters that changed since the last build are
+    re-read. projects.json is only rewritten when the merged data changes.
+    With jobs > 1, changed rosters are parsed in a process pool; problems are
+    still reported in file order.
+    Every row is checked against PROJECTS_SCHEMA and RAW_CLASSES and the
+    result is written to data/build-report.json; with strict, any error
+    stops the build before output is written.
+    Data, index and search files are written under content-hashed names and
+    version.json points at the current set, so browsers can cache them for good.
+    With shard_by ("class" or "grade"), also writes projects.index.<hash>.json
+    and shards/*.json; combined=False skips the single projects.json.
+    With thumbnails, images/ is resized into images/thumbs/ and each project
+    gets srcset/width/height data for its thumbnail.
+    The same work (normalized title + student) in several rosters is reported
+    as duplicate-work; with merge_duplicates only the canonical copy is kept
+    and lists the other classes in `alsoIn` (see resolve_identities).
+    With check_embeds, every embed URL is fetched (see check_embed_urls) and
+    broken ones are reported as warnings.
+    With compact, also writes the dictionary-encoded projects.compact.<hash>.json,
+    which the page prefers over projects.json.
+    With store, the final projects are also upserted into data/showcase.db
+    (see sync_store).
+    With prerender, static grade/*.html and class/*.html pages are written
+    (see write_prerendered).
+    With auto_tags, tags matched in titles by data/tag-taxonomy.json are added
+    (see TagMatcher); tag_stats prints hits per tag.
+    """
     meta = {
         "title": "STEM Tinkercad Showcase – 2025",
         "updated": str(date.today()),
         "autoplayMs": 9000
     }
     # Reload classes with derived grades
-    classes = []
-    for c in RAW_CLASSES:
-        classes.append({
-            "name": c["name"],
-            "grade": derive_grade_label(c["name"]),
-            "count": c["count"],
-            "created": c["created"]
-        })
+    with PROFILE.stage("derive class grades", rows=len(RAW_CLASSES)):
+        classes = []
+        for c in RAW_CLASSES:
+            classes.append({
+                "name": c["name"],
+                "grade": derive_grade_label(c["name"]),
+                "count": c["count"],
+                "created": c["created"]
+            })
+
+    with PROFILE.stage("scan rosters (manifest)") as info:
+        manifest = load_manifest()
+        cached = manifest["files"]
+        files = {}
+        skipped = []
+        rebuilt = []
+        for csv_path in sorted(ROSTERS_DIR.glob("*.csv")):
+            st = csv_path.stat()
+            entry = cached.get(csv_path.name)
+            if entry and (entry["mtime"], entry["size"]) == (st.st_mtime_ns, st.st_size):
+                skipped.append(csv_path.name)
+            else:
+                digest = file_sha256(csv_path)
+                if entry and entry["sha256"] == digest:
+                    # touched but unchanged
+                    skipped.append(csv_path.name)
+                else:
+                    entry = {"sha256": digest}
+                    rebuilt.append(csv_path.name)
+                entry["mtime"] = st.st_mtime_ns
+                entry["size"] = st.st_size
+            files[csv_path.name] = entry
+        info["rows"] = len(files)
+
+    # Parse changed rosters; map() keeps results in sorted-glob order
+    with PROFILE.stage("parse CSV") as info:
+        paths = [ROSTERS_DIR / name for name in rebuilt]
+        if jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(parse_roster, paths))
+        else:
+            results = [parse_roster(path) for path in paths]
+        for name, (rows, lines, file_problems) in zip(rebuilt, results):
+            files[name]["rows"] = rows
+            files[name]["lines"] = lines
+            files[name]["problems"] = file_problems
+        info["rows"] = sum(len(r[0]) for r in results)
+
+    with PROFILE.stage("validate") as info:
+        projects, problems = validate_rosters(files)
+        info["rows"] = len(projects)
+    valid = len(projects)
+    rows_skipped = sum(len(e["rows"]) for e in files.values()) - valid
+    with PROFILE.stage("resolve identities", rows=valid):
+        projects, duplicates = resolve_identities(files, projects, merge=merge_duplicates)
+        problems.extend(duplicates)
+    if auto_tags:
+        with PROFILE.stage("auto-tag", rows=len(projects)):
+            matcher = TagMatcher(load_tag_taxonomy(), count=tag_stats)
+            projects = auto_tag(projects, matcher)
+        if tag_stats:
+            matcher.report()
+    if check_embeds:
+        with PROFILE.stage("check embeds", rows=len(projects)):
+            problems.extend(check_embed_urls(files, base=embed_base))
+    with PROFILE.stage("build report", rows=len(problems)):
+        report = write_build_report(problems, rows_skipped, valid - len(projects))
+    if strict and not report["ok"]:
+        save_manifest(dict(manifest, files=files))
+        sys.exit(f"[FAIL] --strict: {report['errors']} errors, nothing written. See {BUILD_REPORT_PATH}")
+
+    if thumbnails:
+        with PROFILE.stage("thumbnails", rows=len(projects)):
+            projects = with_thumbnails(projects, build_thumbnails())
+
+    if store:
+        with PROFILE.stage("sync store", rows=len(projects)):
+            sync_store(meta, classes, projects)
+
+    with PROFILE.stage("hash output", rows=len(projects)):
+        output_hash = output_digest(classes, projects, shard_by, combined, compact)
+    published = [ROOT / f for k, f in read_version().items() if k in PUBLISHED_KEYS]
+    outputs = ([PROJECTS_JSON_PATH] if combined else []) + [VERSION_PATH] + published
+    unchanged = manifest.get("output") == output_hash and all(p.exists() for p in outputs)
+    if unchanged:
+        print(f"[OK] Output is up to date ({len(projects)} projects).")
+    else:
+        write_outputs(meta, classes, projects, output_hash, shard_by, combined, compact)
+    if prerender:
+        with PROFILE.stage("prerender pages", rows=len(projects)):
+            write_prerendered(meta, classes, projects)
+    with PROFILE.stage("client scripts + manifest"):
+        write_client_scripts()
+        save_manifest({"version": MANIFEST_VERSION, "output": output_hash, "files": files})
+
+    if stats:
+        print(f"[STATS] rosters: {len(files)} total, {len(skipped)} skipped (cached), {len(rebuilt)} rebuilt")
+        for name in rebuilt:
+            print(f"  rebuilt: {name}")
+        print(f"[STATS] output: {'unchanged' if unchanged else 'rewritten'}")
+
+# ---------- Prerendered pages (grade/*.html, class/*.html) ----------
+PRERENDER_DIRS = {"grade": ROOT / "grade", "class": ROOT / "class"}
+PRERENDER_CARDS = 60  # first screens of cards; the page windows the rest in
+GENERATOR_META = '<meta name="generator" content="setup_showcase.py" />'
+HTML_ESCAPES = {"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#039;"}
+THUMB_SIZES = "(max-width: 640px) 100vw, 300px"
+
+def escape_html(s) -> str:
+    """Same as escapeHtml() in the page."""
+    return re.sub(r"[&<>\"']", lambda m: HTML_ESCAPES[m.group()], "" if s is None else str(s))
+
+def escape_attr(s) -> str:
+    """Same as escapeAttr() in the page."""
+    return ("" if s is None else str(s)).replace('"', "&quot;")
+
+def thumb_html(p: dict) -> str:
+    """Python twin of thumbTemplate() in INDEX_HTML."""
+    thumb = p.get("thumbnail") or ""
+    if not thumb.strip():
+        return '<div class="placeholder">No thumbnail</div>'
+    alt = f"{escape_attr(p['title'])} thumbnail"
+    srcset = p.get("thumbSrcset")
+    if not srcset:
+        return f'<img class="thumb" src="{escape_attr(thumb)}" alt="{alt}" loading="lazy" />'
+    sources = "".join(f'<source type="image/{fmt}" srcset="{escape_attr(srcset[fmt])}" sizes="{THUMB_SIZES}" />'
+                      for fmt in ("avif", "webp") if srcset.get(fmt))
+    dims = f' width="{p["thumbWidth"]}" height="{p["thumbHeight"]}"' if p.get("thumbWidth") and p.get("thumbHeight") else ""
+    fallback = f' srcset="{escape_attr(srcset["jpeg"])}" sizes="{THUMB_SIZES}"' if srcset.get("jpeg") else ""
+    return (f'<picture>{sources}<img class="thumb" src="{escape_attr(thumb)}"{fallback}{dims} alt="{alt}" '
+            f'loading="lazy" decoding="async" /></picture>')
+
+def card_html(p: dict, i: int) -> str:
+    """Python twin of cardTemplate() in INDEX_HTML."""
+    return (f'<article class="card" data-idx="{i}" data-id="{escape_attr(p["id"])}" title="Open {escape_attr(p["title"])}">'
+            f'{thumb_html(p)}<div class="meta"><div class="title">{escape_html(p["title"])}</div>'
+            f'<div class="sub">{escape_html(p["student"])} • {escape_html(p["klass"])}</div></div></article>')
+
+def fill_template(html: str, old: str, new: str) -> str:
+    if old not in html:
+        raise ValueError(f"INDEX_HTML no longer contains {old!r}")
+    return html.replace(old, new, 1)
+
+def render_index(pages: dict) -> str:
+    """INDEX_HTML with the grade -> prerendered page map for ?grade= links."""
+    mapping = json.dumps(pages, ensure_ascii=False).replace("</", "<\\/")
+    return fill_template(INDEX_HTML, "const PRERENDERED_PAGES = {};", f"const PRERENDERED_PAGES = {mapping};")
+
+def render_prerendered(pages: dict, page: str, meta: dict, classes: list, grade: str, klass: str,
+                       cards: list, total: int) -> str:
+    """
+    One grade or class page: INDEX_HTML with the title, grade chips, class
+    menu, count and first cards already in the markup. <base> points at the
+    site root, so the page's relative URLs work from its subfolder.
+    """
+    html = render_index(pages)
+    name = klass or grade
+    grades = ["All", *sorted({c["grade"] for c in classes})]
+    chips = "".join(f'<button class="chip{" active" if g == grade else ""}">{escape_html(g)}</button>' for g in grades)
+    options = f'<option value="__ALL__">All Classes ({escape_html(grade)})</option>' + "".join(
+        f'<option value="{escape_attr(c["name"])}"{" selected" if c["name"] == klass else ""}>{escape_html(c["name"])}</option>'
+        for c in classes if c["grade"] == grade)
+    state = f' data-page="{escape_attr(page)}" data-grade="{escape_attr(grade)}"'
+    if klass:
+        state += f' data-class="{escape_attr(klass)}"'
+    title = meta.get("title") or "STEM Tinkercad Showcase"
+    html = fill_template(html, '<html lang="en">', f'<html lang="en"{state}>')
+    html = fill_template(html, '<meta charset="utf-8" />', '<meta charset="utf-8" />\n  <base href="../" />')
+    html = fill_template(html, "<title>STEM Tinkercad Showcase</title>",
+                         f"<title>{escape_html(name)} – {escape_html(title)}</title>")
+    html = fill_template(html, '<h1 id="pageTitle">STEM Tinkercad Showcase</h1>',
+                         f'<h1 id="pageTitle">{escape_html(title)}</h1>')
+    html = fill_template(html, '<div class="filters" id="gradeFilters"></div>',
+                         f'<div class="filters" id="gradeFilters">{chips}</div>')
+    html = fill_template(html, '<option value="__ALL__">All Classes</option>', options)
+    html = fill_template(html, '<div class="count" id="countText"></div>',
+                         f'<div class="count" id="countText">{total} project{"" if total == 1 else "s"}</div>')
+    return fill_template(html, '<main class="grid" id="grid"></main>',
+                         '<main class="grid" id="grid">\n' + "\n".join(cards) + '\n  </main>')
+
+def write_if_changed(path: Path, text: str) -> bool:
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    write_text_atomic(path, text)
+    return True
+
+def write_prerendered(meta: dict, classes: list, projects: list) -> dict:
+    """
+    Writes a static page per grade and per class showing what the page would
+    for that filter with the default sort (newest first), up to
+    PRERENDER_CARDS cards. Unchanged pages are not rewritten and stale ones
+    (only files carrying the generator tag) are removed. index.html gets the
+    grade -> page map when it is the generated one. Returns that map.
+    """
+    newest = sort_orders(projects)["date-desc"]  # the page's default sort
+
+    targets = {}  # page -> (grade, klass)
+    pages = {}
+    for grade in sorted({c["grade"] for c in classes}):
+        page = f"grade/{normalize_id(grade) or 'other'}.html"
+        targets[page] = (grade, None)
+        pages[grade] = page
+    for c in classes:
+        targets[f"class/{normalize_id(c['name']) or 'other'}.html"] = (c["grade"], c["name"])
+
+    # one pass in sort order fills every page; same test as keep() in the page
+    cards = {page: [] for page in targets}
+    totals = dict.fromkeys(targets, 0)
+    grade_pages = {g: page for page, (g, k) in targets.items() if k is None}
+    class_pages = {k: page for page, (g, k) in targets.items() if k is not None}
+    for n in newest:
+        p = projects[n]
+        matched = [grade_pages.get(p["grade"])]
+        matched += [class_pages.get(k) for k in {p["klass"], *p.get("alsoIn", [])}
+                    if targets.get(class_pages.get(k), (None,))[0] == p["grade"]]
+        for page in filter(None, matched):
+            if totals[page] < PRERENDER_CARDS:
+                cards[page].append(card_html(p, totals[page]))
+            totals[page] += 1
+
+    written = 0
+    for page, (grade, klass) in targets.items():
+        text = render_prerendered(pages, page, meta, classes, grade, klass, cards[page], totals[page])
+        written += write_if_changed(ROOT / page, text)
+    for folder in PRERENDER_DIRS.values():
+        for stale in folder.glob("*.html"):
+            rel = stale.relative_to(ROOT).as_posix()
+            if rel not in targets and GENERATOR_META in stale.read_text(encoding="utf-8"):
+                stale.unlink()
+
+    if INDEX_HTML_PATH.exists() and GENERATOR_META not in INDEX_HTML_PATH.read_text(encoding="utf-8"):
+        print(f"[WARN] {INDEX_HTML_PATH.name} is hand-written (no generator tag); ?grade= links there won't "
+              f"jump to prerendered pages.")
+    else:
+        write_if_changed(INDEX_HTML_PATH, render_index(pages))
+    print(f"[OK] Prerendered {len(grade_pages)} grade and {len(class_pages)} class pages "
+          f"({written} changed, up to {PRERENDER_CARDS} cards each).")
+    return pages
+
+# ---------- SQLite store (--store / --query / --sql / --export) ----------
+STORE_PATH = DATA_DIR / "showcase.db"
+STORE_VERSION = 1  # bump when STORE_SCHEMA changes; older stores are rebuilt
+STORE_STALE_KEY = "_stale"  # meta row set while the store lags the rosters
+STORE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS classes (
+  name TEXT PRIMARY KEY, grade TEXT NOT NULL, count INTEGER NOT NULL, created TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+  id TEXT PRIMARY KEY, ord INTEGER NOT NULL,
+  title TEXT NOT NULL, student TEXT NOT NULL, klass TEXT NOT NULL, grade TEXT NOT NULL,
+  embed_url TEXT NOT NULL, date TEXT NOT NULL,
+  row_hash TEXT NOT NULL, record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS project_tags (
+  project_id TEXT NOT NULL, tag TEXT NOT NULL, PRIMARY KEY (project_id, tag)
+);
+CREATE INDEX IF NOT EXISTS projects_ord ON projects(ord);
+CREATE INDEX IF NOT EXISTS projects_klass ON projects(klass, date);
+CREATE INDEX IF NOT EXISTS projects_grade ON projects(grade, date);
+CREATE INDEX IF NOT EXISTS projects_date ON projects(date);
+CREATE INDEX IF NOT EXISTS project_tags_tag ON project_tags(tag);
+"""
 
-    projects = []
-    headers = ["id","title","student","klass","grade","thumbnail","embedUrl","tags","date"]
-    for csv_path in sorted(ROSTERS_DIR.glob("*.csv")):
-        with csv_path.open(newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            # Validate header
-            if reader.fieldnames != headers:
-                print(f"[WARN] {csv_path.name} has unexpected columns. Expected {headers} got {reader.fieldnames}")
-            for row in reader:
-                id_ = (row.get("id") or "").strip()
-                title = (row.get("title") or "").strip()
-                student = (row.get("student") or "").strip()
-                klass = (row.get("klass") or "").strip()
-                grade = (row.get("grade") or "").strip() or derive_grade_label(klass)
-                thumbnail = (row.get("thumbnail") or "").strip()
-                embed = (row.get("embedUrl") or "").strip()
-                tags = [t.strip() for t in (row.get("tags") or "").replace(",", ";").split(";") if t.strip()]
-                dt = (row.get("date") or "").strip()
-
-                if not (id_ and title and student and klass and embed):
-                    # skip incomplete lines
-                    continue
-                # Basic embed sanity check
-                if "tinkercad.com/embed/" not in embed:
-                    print(f"[WARN] {csv_path.name} row id={id_}: embedUrl is not an EMBED link.")
-                projects.append({
-                    "id": id_,
-                    "title": title,
-                    "student": student,
-                    "klass": klass,
-                    "grade": grade,
-                    "thumbnail": thumbnail,
-                    "embedUrl": embed,
-                    "tags": tags,
-                    "date": dt
-                })
-
-    data = {
-        "meta": meta,
-        "classes": classes,
-        "projects": projects
-    }
-    PROJECTS_JSON_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"[OK] Wrote {PROJECTS_JSON_PATH} with {len(projects)} projects.")
+# Named reports for --query. {filters} becomes " AND <clause>..." on projects p;
+# the params listed here come before the filter params. A report with a
+# {class_filters} slot applies --grade/--class to classes c there instead, so
+# they pick classes rather than just emptying their counts.
+STORE_QUERIES = {
+    "per-grade": ("""
+        SELECT p.grade, COUNT(*) AS projects, COUNT(DISTINCT p.student) AS students
+        FROM projects p WHERE 1 = 1{filters} GROUP BY p.grade ORDER BY p.grade""", []),
+    "per-class": ("""
+        SELECT c.name AS class, c.grade, c.count AS enrolled, COUNT(p.id) AS projects,
+               COUNT(DISTINCT p.student) AS students
+        FROM classes c LEFT JOIN projects p ON p.klass = c.name{filters}
+        WHERE 1 = 1{class_filters}
+        GROUP BY c.name ORDER BY c.rowid""", []),
+    "per-tag": ("""
+        SELECT t.tag, COUNT(*) AS projects
+        FROM project_tags t JOIN projects p ON p.id = t.project_id{filters}
+        GROUP BY t.tag ORDER BY projects DESC, t.tag""", []),
+    "missing-embeds": ("""
+        SELECT p.student, p.klass AS class, p.id, p.title
+        FROM projects p WHERE p.embed_url IN ('', ?){filters} ORDER BY p.ord""", [PLACEHOLDER_EMBED_URL]),
+    "list": ("""
+        SELECT p.id, p.title, p.student, p.klass AS class, p.grade, p.date
+        FROM projects p WHERE 1 = 1{filters} ORDER BY p.ord""", []),
+}
+
+def open_store(readonly: bool = False) -> sqlite3.Connection:
+    """Opens data/showcase.db, creating (or rebuilding an outdated) schema unless readonly."""
+    if readonly:
+        if not STORE_PATH.exists():
+            sys.exit(f"[FAIL] No store at {STORE_PATH}. Run --build-json --store first.")
+        con = sqlite3.connect(f"{STORE_PATH.as_uri()}?mode=ro", uri=True)
+        if con.execute("PRAGMA user_version").fetchone()[0] != STORE_VERSION:
+            sys.exit(f"[FAIL] {STORE_PATH} is from an older version. Run --build-json --store to rebuild it.")
+        return con
+    STORE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(STORE_PATH)
+    if con.execute("PRAGMA user_version").fetchone()[0] != STORE_VERSION:
+        con.executescript("DROP TABLE IF EXISTS meta; DROP TABLE IF EXISTS classes; "
+                          "DROP TABLE IF EXISTS projects; DROP TABLE IF EXISTS project_tags;")
+        con.execute(f"PRAGMA user_version = {STORE_VERSION}")
+    con.executescript(STORE_SCHEMA)
+    return con
+
+def sync_store(meta: dict, classes: list, projects: list) -> dict:
+    """
+    Upserts the build's classes and projects into the store in one
+    transaction. A project row (and its tags) is only rewritten when its
+    record changed; a row that only moved gets its `ord` updated; rows no
+    longer in the rosters are deleted. Returns the counts, or None when
+    repeated ids (duplicate-id errors) leave the store as it was: rows are
+    keyed by id, so one copy would silently replace the other. The store is
+    then marked stale, and --export refuses it until a clean sync.
+    """
+    repeated = sorted(id_ for id_, n in Counter(p["id"] for p in projects).items() if n > 1)
+    if repeated:
+        with closing(open_store()) as con, con:
+            con.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (STORE_STALE_KEY, json.dumps(repeated)))
+        print(f"[FAIL] Store {STORE_PATH.name} not synced: {len(repeated)} id(s) used more than once "
+              f"({', '.join(map(repr, repeated[:5]))}{', ...' if len(repeated) > 5 else ''}). "
+              f"Fix the duplicate-id errors in {BUILD_REPORT_PATH.name}.")
+        return None
+    counts = {"inserted": 0, "updated": 0, "moved": 0, "deleted": 0, "unchanged": 0}
+    with closing(open_store()) as con, con:
+        con.execute("DELETE FROM meta")
+        con.executemany("INSERT INTO meta VALUES (?, ?)",
+                        [(k, json.dumps(v, ensure_ascii=False)) for k, v in meta.items()])
+        con.execute("DELETE FROM classes")
+        con.executemany("INSERT INTO classes VALUES (?, ?, ?, ?)",
+                        [(c["name"], c["grade"], c["count"], c["created"]) for c in classes])
+
+        old = {id_: (ord_, h) for id_, ord_, h in con.execute("SELECT id, ord, row_hash FROM projects")}
+        rows, tags, moved = [], [], []
+        for n, p in enumerate(projects):
+            record = json.dumps(p, ensure_ascii=False)
+            h = hashlib.sha256(record.encode("utf-8")).hexdigest()
+            prev = old.pop(p["id"], None)
+            if prev == (n, h):
+                counts["unchanged"] += 1
+            elif prev and prev[1] == h:
+                counts["moved"] += 1
+                moved.append((n, p["id"]))
+            else:
+                counts["updated" if prev else "inserted"] += 1
+                rows.append((p["id"], n, p["title"], p["student"], p["klass"], p["grade"],
+                             p["embedUrl"], p["date"], h, record))
+                tags.extend((p["id"], t) for t in p["tags"])
+        gone = [(id_,) for id_ in old]
+        counts["deleted"] = len(gone)
+        con.executemany("DELETE FROM projects WHERE id = ?", gone)
+        con.executemany("DELETE FROM project_tags WHERE project_id = ?", gone + [(r[0],) for r in rows])
+        con.executemany("UPDATE projects SET ord = ? WHERE id = ?", moved)
+        con.executemany("INSERT OR REPLACE INTO projects VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        con.executemany("INSERT OR IGNORE INTO project_tags VALUES (?, ?)", tags)
+    print(f"[OK] Store {STORE_PATH.name}: " + ", ".join(f"{n} {k}" for k, n in counts.items()) + ".")
+    return counts
+
+def month_range(month: str):
+    """'YYYY-MM' (or 'this') -> ('YYYY-MM-01', first day of the next month)."""
+    if month == "this":
+        month = date.today().strftime("%Y-%m")
+    if not re.fullmatch(r"\d{4}-(0[1-9]|1[0-2])", month):
+        sys.exit(f"--month must be YYYY-MM or 'this', got {month!r}")
+    y, m = int(month[:4]), int(month[5:])
+    return f"{month}-01", f"{y + m // 12:04d}-{m % 12 + 1:02d}-01"
+
+def store_filters(filters: dict, table: str = "p"):
+    """
+    Turns --grade/--class/--tag/--month/--since into index-friendly clauses on
+    projects p. With table="c" only --grade/--class apply, to classes c.
+    """
+    clauses, params = [], []
+    if filters.get("grade"):
+        clauses.append(f"{table}.grade = ?")
+        params.append(filters["grade"])
+    if filters.get("klass"):
+        clauses.append("c.name = ?" if table == "c" else "p.klass = ?")
+        params.append(filters["klass"])
+    if table == "c":
+        return "".join(f" AND {c}" for c in clauses), params
+    if filters.get("tag"):
+        clauses.append("p.id IN (SELECT project_id FROM project_tags WHERE tag = ?)")
+        params.append(filters["tag"])
+    if filters.get("month"):
+        clauses.append("p.date >= ? AND p.date < ?")
+        params.extend(month_range(filters["month"]))
+    if filters.get("since"):
+        clauses.append("p.date >= ?")
+        params.append(filters["since"])
+    return "".join(f" AND {c}" for c in clauses), params
+
+def print_table(cursor):
+    head = [d[0] for d in cursor.description]
+    rows = [["" if v is None else str(v) for v in r] for r in cursor]
+    widths = [max(map(len, col)) for col in zip(head, *rows)]
+    for r in [head, ["-" * w for w in widths]] + rows:
+        print("  ".join(v.ljust(w) for v, w in zip(r, widths)).rstrip())
+    print(f"({len(rows)} rows)")
+
+def run_query(name: str = None, sql: str = None, filters: dict = None):
+    """Prints a named report (STORE_QUERIES) or an ad-hoc SQL query; the store is opened read-only."""
+    if sql is None and name not in STORE_QUERIES:
+        sys.exit(f"--query must be one of {', '.join(STORE_QUERIES)}, got {name!r}")
+    with closing(open_store(readonly=True)) as con:
+        if con.execute("SELECT 1 FROM meta WHERE key = ?", (STORE_STALE_KEY,)).fetchone():
+            print(f"[WARN] {STORE_PATH.name} is out of date: the last --store build had repeated ids.")
+        try:
+            if sql is not None:
+                cursor = con.execute(sql)
+            else:
+                template, params = STORE_QUERIES[name]
+                filters = filters or {}
+                class_where, class_params = "", []
+                if "{class_filters}" in template:
+                    class_where, class_params = store_filters(filters, table="c")
+                    filters = {k: v for k, v in filters.items() if k not in ("grade", "klass")}
+                where, where_params = store_filters(filters)
+                cursor = con.execute(template.format(filters=where, class_filters=class_where),
+                                     params + where_params + class_params)
+            print_table(cursor)
+        except sqlite3.Error as e:
+            sys.exit(f"[FAIL] {e}")
+
+def export_from_store(shard_by=None, combined: bool = True, compact: bool = False):
+    """
+    Writes projects.json / shards / search index / version.json from the
+    store, reading projects in one scan of the ord index. A stale store
+    (see sync_store) is refused rather than exported.
+    """
+    with closing(open_store(readonly=True)) as con:
+        stale = con.execute("SELECT value FROM meta WHERE key = ?", (STORE_STALE_KEY,)).fetchone()
+        if stale:
+            sys.exit(f"[FAIL] {STORE_PATH} is out of date: ids {', '.join(map(repr, json.loads(stale[0])))} "
+                     f"were used more than once. Fix them, then run --build-json --store.")
+        meta = {k: json.loads(v) for k, v in con.execute(
+            "SELECT key, value FROM meta WHERE key != ? ORDER BY rowid", (STORE_STALE_KEY,))}
+        classes = [{"name": n, "grade": g, "count": c, "created": cr}
+                   for n, g, c, cr in con.execute("SELECT name, grade, count, created FROM classes ORDER BY rowid")]
+        with PROFILE.stage("scan store") as info:
+            projects = [json.loads(r) for (r,) in con.execute("SELECT record FROM projects ORDER BY ord")]
+            info["rows"] = len(projects)
+    write_outputs(meta, classes, projects, output_digest(classes, projects, shard_by, combined, compact),
+                  shard_by, combined, compact)
+
+# ---------- Dev server (--serve / --watch) ----------
+RELOAD_PATH = "/__reload"
+RELOAD_SNIPPET = (
+    b"<script>new EventSource('" + RELOAD_PATH.encode() + b"')"
+    b".addEventListener('reload', () => location.reload());</script>"
+)
+WATCH_INTERVAL = 0.25  # seconds between polls
+WATCH_SETTLE = 0.4     # quiet time before a burst of changes is rebuilt once
+WATCH_SUFFIXES = {".csv", ".html", ".css", ".js"} | IMAGE_EXTS
+
+class ReloadHub:
+    """Counts finished rebuilds and wakes the open event streams."""
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.version = 0
+
+    def notify(self):
+        with self.cond:
+            self.version += 1
+            self.cond.notify_all()
+
+    def wait(self, seen: int, timeout: float) -> int:
+        with self.cond:
+            self.cond.wait_for(lambda: self.version != seen, timeout)
+            return self.version
+
+class ShowcaseHandler(SimpleHTTPRequestHandler):
+    """
+    Serves showcase/ without caching. With live reload on, HTML pages get a
+    small EventSource snippet and RELOAD_PATH streams a `reload` event
+    (Server-Sent Events) after every rebuild.
+    """
+    hub = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=str(ROOT), **kwargs)
+
+    def end_headers(self):
+        self.send_header("Cache-Control", "no-store")
+        super().end_headers()
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if self.hub and path == RELOAD_PATH:
+            return self.stream_reloads()
+        if self.hub and (path.endswith(".html") or path.endswith("/")):
+            page = Path(self.translate_path(path))
+            if page.is_dir():
+                page = page / "index.html"
+            if page.is_file():
+                body = page.read_bytes().replace(b"</body>", RELOAD_SNIPPET + b"</body>", 1)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+        super().do_GET()
+
+    def stream_reloads(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        seen = self.hub.version
+        try:
+            while True:
+                version = self.hub.wait(seen, 15)
+                if version == seen:
+                    self.wfile.write(b": ping\n\n")  # keep-alive
+                else:
+                    seen = version
+                    self.wfile.write(f"event: reload\ndata: {version}\n\n".encode())
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, format, *args):
+        if not self.path.startswith(RELOAD_PATH):
+            super().log_message(format, *args)
+
+def watch_snapshot() -> dict:
+    """Returns {path: (mtime, size)} for rosters, images and top-level pages."""
+    snap = {}
+    candidates = list(ROSTERS_DIR.glob("*.csv")) + list(IMAGES_DIR.rglob("*")) + list(ROOT.glob("*.*"))
+    for p in candidates:
+        if p.suffix.lower() in WATCH_SUFFIXES and THUMBS_DIR not in p.parents and p.is_file():
+            st = p.stat()
+            snap[p] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+def watch_and_rebuild(hub: ReloadHub, build_opts: dict):
+    """
+    Polls for changes and coalesces bursts: once nothing has changed for
+    WATCH_SETTLE seconds, rebuilds once (incrementally, via the manifest) if a
+    roster or image changed, then tells open pages to reload.
+    """
+    last = watch_snapshot()
+    pending = set()
+    changed_at = 0.0
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        current = watch_snapshot()
+        changed = {p for p in current.keys() | last.keys() if current.get(p) != last.get(p)}
+        last = current
+        if changed:
+            pending |= changed
+            changed_at = time.monotonic()
+            continue
+        if not pending or time.monotonic() - changed_at < WATCH_SETTLE:
+            continue
+        batch, pending = pending, set()
+        rebuild = any(ROSTERS_DIR in p.parents or IMAGES_DIR in p.parents for p in batch)
+        start = time.perf_counter()
+        if rebuild:
+            try:
+                build_json_from_rosters(**build_opts)
+            except SystemExit as e:  # --strict failure: keep serving the last good build
+                print(e)
+                continue
+            except Exception as e:  # e.g. a roster caught mid-save; retried on its next change
+                print(f"[FAIL] Rebuild failed, still serving the last good build: {type(e).__name__}: {e}")
+                continue
+            last = watch_snapshot()  # don't react to files the build itself wrote
+        print(f"[WATCH] {len(batch)} file(s) changed; {'rebuilt' if rebuild else 'reloading'} "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        hub.notify()
+
+def serve(port: int = 8000, watch: bool = False, build_opts: dict = None):
+    """Serves showcase/ on localhost; with watch, rebuilds and live-reloads on change."""
+    if watch:
+        build_json_from_rosters(**(build_opts or {}))
+        ShowcaseHandler.hub = ReloadHub()
+        threading.Thread(target=watch_and_rebuild, args=(ShowcaseHandler.hub, build_opts or {}), daemon=True).start()
+    server = ThreadingHTTPServer(("127.0.0.1", port), ShowcaseHandler)
+    server.daemon_threads = True
+    print(f"[OK] Serving {ROOT} at http://127.0.0.1:{port}/" + (" (watching for changes)" if watch else ""))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+# ---------- Release bundle (--release) ----------
+RELEASE_DIR = ROOT / "dist"
+COMPRESSIBLE = {".html", ".js", ".json", ".css", ".svg"}
+PRESERVE_RE = re.compile(r"(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)", re.S | re.I)
+
+def minify_css(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    return css.replace(";}", "}").strip()
+
+def minify_js(js: str) -> str:
+    """
+    Line-based and conservative: drops indentation, blank lines and whole-line
+    comments but keeps every line break, so automatic semicolon insertion and
+    template literals behave exactly as before.
+    """
+    out = []
+    in_comment = False
+    for line in js.splitlines():
+        s = line.strip()
+        if in_comment:
+            in_comment = "*/" not in s
+            continue
+        if s.startswith("/*"):
+            in_comment = "*/" not in s
+            continue
+        if s and not s.startswith("//"):
+            out.append(s)
+    return "\n".join(out)
+
+def minify_markup(html: str) -> str:
+    html = re.sub(r"<!--(?!\[if).*?-->", "", html, flags=re.S)
+    html = re.sub(r"\s*\n\s*", "\n", html)
+    return re.sub(r"[ \t]{2,}", " ", html)
+
+def minify_html(html: str) -> str:
+    """Minifies markup plus inline <style>/<script>; <pre>/<textarea> stay verbatim."""
+    parts = []
+    pos = 0
+    for m in PRESERVE_RE.finditer(html):
+        open_tag, tag, body, close_tag = m.groups()
+        tag = tag.lower()
+        if tag == "style":
+            body = minify_css(body)
+        elif tag == "script" and "src=" not in open_tag:
+            body = minify_js(body)
+        parts.append(minify_markup(html[pos:m.start()]) + minify_markup(open_tag) + body + close_tag)
+        pos = m.end()
+    parts.append(minify_markup(html[pos:]))
+    return "".join(parts).strip()
+
+def compact_json(text: str) -> str:
+    return json.dumps(json.loads(text), ensure_ascii=False, separators=(",", ":"))
+
+def rewrite_refs(text: str, renames: dict) -> str:
+    for old, new in renames.items():
+        text = text.replace(f'"{old}"', f'"{new}"').replace(f"'{old}'", f"'{new}'")
+    return text
+
+def fingerprint(name: str, text: str) -> str:
+    """projects.<old hash>.json -> projects.<hash of text>.json, showcase-data.js -> showcase-data.<hash>.js"""
+    stem, _, suffix = re.sub(HASHED_SUFFIX_RE + "$", ".json", name).rpartition(".")
+    return f"{stem}.{hashlib.sha256(text.encode('utf-8')).hexdigest()[:10]}.{suffix}"
+
+def emit_release_file(name: str, text: str, before: int) -> dict:
+    """Writes dist/<name> plus .gz (and .br when brotli is installed) siblings."""
+    path = RELEASE_DIR / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = text.encode("utf-8")
+    path.write_bytes(data)
+    row = {"name": name, "before": before, "after": len(data), "gzip": None, "brotli": None}
+    if path.suffix in COMPRESSIBLE:
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        path.with_name(path.name + ".gz").write_bytes(gz)
+        row["gzip"] = len(gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            path.with_name(path.name + ".br").write_bytes(br)
+            row["brotli"] = len(br)
+    return row
+
+def release_bundle():
+    """
+    Builds showcase/dist for deployment: minified pages and service worker,
+    compact JSON and showcase-data.js under content-hashed names (references
+    in version.json, the shard index and the pages are rewritten to match;
+    sw.js keeps its name, as browsers register it by URL), precompressed
+    .gz/.br siblings and a copy of images/. Prints a before/after size report.
+    """
+    version = read_version()
+    if not version:
+        sys.exit("[FAIL] version.json is missing; run --build-json first.")
+    if RELEASE_DIR.exists():
+        shutil.rmtree(RELEASE_DIR)
+    RELEASE_DIR.mkdir(parents=True)
+
+    renames = {}
+    rows = []
+
+    def emit_data(name: str):
+        src = ROOT / name
+        text = rewrite_refs(compact_json(src.read_text(encoding="utf-8")), renames)
+        renames[name] = fingerprint(name, text)
+        rows.append(emit_release_file(renames[name], text, src.stat().st_size))
+
+    # Dependencies first: shards before the index that lists them, data
+    # files before version.json and the pages that point at them.
+    if version.get("index"):
+        index = json.loads((ROOT / version["index"]).read_text(encoding="utf-8"))
+        for shard in index.get("shards", []):
+            emit_data(shard["file"])
+    for key in PUBLISHED_KEYS:
+        if version.get(key):
+            emit_data(version[key])
+    if version.get("data"):
+        renames["projects.json"] = renames[version["data"]]
+
+    text = rewrite_refs(compact_json(VERSION_PATH.read_text(encoding="utf-8")), renames)
+    rows.append(emit_release_file(VERSION_PATH.name, text, VERSION_PATH.stat().st_size))
+    if CLIENT_DATA_JS_PATH.exists():  # shared by every page, so cached long-term like the data
+        text = rewrite_refs(minify_js(CLIENT_DATA_JS_PATH.read_text(encoding="utf-8")), renames)
+        renames[CLIENT_DATA_JS_PATH.name] = fingerprint(CLIENT_DATA_JS_PATH.name, text)
+        rows.append(emit_release_file(renames[CLIENT_DATA_JS_PATH.name], text, CLIENT_DATA_JS_PATH.stat().st_size))
+    pages = [*ROOT.glob("*.html"), *(p for d in PRERENDER_DIRS.values() for p in d.glob("*.html"))]
+    for page in sorted(pages):
+        text = rewrite_refs(minify_html(page.read_text(encoding="utf-8")), renames)
+        rows.append(emit_release_file(page.relative_to(ROOT).as_posix(), text, page.stat().st_size))
+    if SW_PATH.exists():
+        text = rewrite_refs(minify_js(SW_PATH.read_text(encoding="utf-8")), renames)
+        rows.append(emit_release_file(SW_PATH.name, text, SW_PATH.stat().st_size))
+
+    images = 0
+    if IMAGES_DIR.exists():
+        shutil.copytree(IMAGES_DIR, RELEASE_DIR / IMAGES_DIR.name)
+        images = sum(1 for p in IMAGES_DIR.rglob("*") if p.is_file())
+
+    def size(n):
+        return "-" if n is None else f"{n / 1024:.1f} KB"
+    print(f"[RELEASE] {'asset':<40} {'before':>10} {'after':>10} {'gzip':>10} {'brotli':>10}")
+    for r in rows:
+        print(f"  {r['name']:<46} {size(r['before']):>10} {size(r['after']):>10} {size(r['gzip']):>10} {size(r['brotli']):>10}")
+    totals = {k: sum(r[k] or 0 for r in rows) for k in ("before", "after", "gzip", "brotli")}
+    print(f"  {'total':<46} {size(totals['before']):>10} {size(totals['after']):>10} {size(totals['gzip']):>10} "
+          f"{size(totals['brotli'] if brotli is not None else None):>10}")
+    if brotli is None:
+        print("[WARN] brotli is not installed; skipped .br files (pip install brotli).")
+    print(f"[OK] Wrote release bundle to {RELEASE_DIR} ({len(rows)} assets, {images} images copied).")
 
 # ---------- CLI ----------
 def main():
     seed_n = 0
     build = False
+    stats = False
+    jobs = 1
+    shard_by = None
+    combined = True
+    thumbnails = False
+    strict = False
+    compact = False
+    check_embeds = False
+    embed_base = None
+    merge_duplicates = False
+    store = False
+    prerender = False
+    auto_tags = False
+    tag_stats = False
+    query = None
+    sql = None
+    export = False
+    filters = {}
+    release = False
+    profile = False
+    profile_out = None
+    serve_mode = False
+    watch = False
+    port = 8000
     args = sys.argv[1:]
     i = 0
     while i < len(args):
@@ -671,16 +3178,104 @@ def main():
             seed_n = int(args[i])
         elif a in ("--build-json","-b"):
             build = True
+        elif a == "--stats":
+            stats = True
+        elif a in ("--jobs", "-j"):
+            i += 1
+            jobs = int(args[i])
+        elif a == "--shard":
+            i += 1
+            shard_by = args[i]
+            if shard_by not in ("class", "grade"):
+                sys.exit(f"--shard must be 'class' or 'grade', got {shard_by!r}")
+        elif a == "--no-combined":
+            combined = False
+        elif a == "--thumbnails":
+            thumbnails = True
+        elif a == "--strict":
+            strict = True
+        elif a == "--merge-duplicates":
+            merge_duplicates = True
+        elif a == "--check-embeds":
+            check_embeds = True
+        elif a == "--embed-base":
+            i += 1
+            embed_base = args[i]
+        elif a == "--compact":
+            compact = True
+        elif a == "--store":
+            store = True
+        elif a == "--prerender":
+            prerender = True
+        elif a == "--auto-tag":
+            auto_tags = True
+        elif a == "--tag-stats":
+            tag_stats = True
+        elif a == "--query":
+            i += 1
+            query = args[i]
+        elif a == "--sql":
+            i += 1
+            sql = args[i]
+        elif a == "--export":
+            export = True
+        elif a in ("--grade", "--class", "--tag", "--month", "--since"):
+            i += 1
+            filters["klass" if a == "--class" else a[2:]] = args[i]
+        elif a == "--profile":
+            profile = True
+        elif a == "--profile-out":
+            i += 1
+            profile = True
+            profile_out = Path(args[i])
+        elif a == "--release":
+            release = True
+        elif a == "--serve":
+            serve_mode = True
+        elif a == "--watch":
+            watch = True
+        elif a == "--port":
+            i += 1
+            port = int(args[i])
         else:
             print(f"Unknown arg: {a}")
         i += 1
 
-    if build:
+    if not combined and not shard_by and not compact:
+        sys.exit("--no-combined needs --shard class|grade or --compact, otherwise nothing would be written.")
+
+    build_opts = {"stats": stats, "jobs": jobs, "shard_by": shard_by, "combined": combined,
+                  "thumbnails": thumbnails, "strict": strict, "compact": compact,
+                  "check_embeds": check_embeds, "embed_base": embed_base, "merge_duplicates": merge_duplicates,
+                  "store": store, "prerender": prerender, "auto_tags": auto_tags, "tag_stats": tag_stats}
+    if query or sql:
+        run_query(query, sql, filters)
+        return
+
+    if serve_mode or watch:
+        ensure_dirs()
+        serve(port=port, watch=watch, build_opts=build_opts)
+        return
+
+    if profile:
+        PROFILE.start(profile_out)
+
+    if export:
+        export_from_store(shard_by=shard_by, combined=combined, compact=compact)
+        PROFILE.report()
+        return
+
+    if build or release:
         ensure_dirs()
-        build_json_from_rosters()
+        build_json_from_rosters(**build_opts)
+        if release:
+            with PROFILE.stage("release bundle"):
+                release_bundle()
+        PROFILE.report()
         return
 
     write_initial_files(seed_n=seed_n)
+    PROFILE.report()
     print(f"[OK] Created scaffold in: {ROOT}\n - index.html\n - projects.json\n - projects.schema.json\n - rosters/*.csv\n - images/ (place thumbnails here)")
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+// Generated by setup_showcase.py. One data layer for every showcase page:
+//   const data = await ShowcaseData.load();  // { meta, classes, projects }
+//   const summary = await ShowcaseData.rollups();  // counts only (projects.rollups.json)
+// Projects come back with a lowercased `_q` search field. The parsed dataset
+// is kept in IndexedDB under the build's version (version.json), so moving
+// between pages reuses it until a new build is published.
+(function () {
+  const DB_NAME = 'showcase', STORE = 'datasets';
+  let versionPromise = null;
+
+  function fetchJson(url, opts) {
+    return fetch(url, opts).then(r => { if (!r.ok) throw new Error(url + ' not found'); return r.json(); });
+  }
+
+  // version.json: { version, updated, data?, compact?, index?, search }, or null
+  // when the site has no build pointer (then projects.json is read directly).
+  function version() {
+    if (!versionPromise) versionPromise = fetchJson('version.json', { cache:'no-cache' }).catch(() => null);
+    return versionPromise;
+  }
+
+  // performance.measure() spans (fetch, parse, cache, ...); only the latest
+  // measure per name is kept. Pages show them with ?debug=1.
+  function span(name) {
+    if (typeof performance === 'undefined' || !performance.measure) return () => {};
+    const start = name + ':start', end = name + ':end';
+    performance.mark(start);
+    return () => {
+      performance.mark(end);
+      performance.clearMeasures(name);
+      performance.measure(name, start, end);
+      performance.clearMarks(start); performance.clearMarks(end);
+    };
+  }
+
+  function withSearchText(p) {
+    return { ...p, _q: (p.title + ' ' + p.student + ' ' + (p.tags||[]).join(' ') + ' ' + p.klass).toLowerCase() };
+  }
+
+  // projects.compact.json keeps klass/grade/tags in lookup tables and the
+  // projects column-wise; rebuild the same objects projects.json holds.
+  // Rows in embedWhole hold the whole embed URL rather than a Tinkercad id.
+  function decodeCompact(c) {
+    const col = c.columns, projects = new Array(c.count), whole = new Set(c.embedWhole);
+    for (let i = 0; i < c.count; i++) {
+      const embed = col.embed[i];
+      const p = {
+        id: col.id[i], title: col.title[i], student: col.student[i],
+        klass: c.klasses[col.klass[i]], grade: c.grades[col.grade[i]],
+        thumbnail: col.thumbnail[i],
+        embedUrl: whole.has(i) ? embed : c.embedPrefix + embed + c.embedSuffix,
+        tags: col.tags[i].map(t => c.tags[t]), date: col.date[i]
+      };
+      for (const k of c.extra) if (col[k][i] !== null) p[k] = col[k][i];
+      projects[i] = p;
+    }
+    return { meta: c.meta, classes: c.classes, projects };
+  }
+
+  // The whole dataset from the network: compact payload, combined file, or
+  // every shard of a sharded build.
+  async function fetchDataset(v) {
+    let data;
+    const fetched = span('fetch');
+    if (v?.compact) {
+      data = await fetchJson(v.compact);
+    } else if (v?.data || !v?.index) {
+      data = await fetchJson(v?.data || 'projects.json', { cache: v?.data ? 'default' : 'no-cache' });
+    } else {
+      const index = await fetchJson(v.index);
+      const shards = await Promise.all(index.shards.map(s => fetchJson(s.file)));
+      data = { meta: index.meta, classes: index.classes, projects: shards.flatMap(s => s.projects || []) };
+    }
+    fetched();
+    const parsed = span('parse');
+    if (v?.compact) data = decodeCompact(data);
+    data = { meta: data.meta || {}, classes: data.classes || [], projects: (data.projects || []).map(withSearchText) };
+    parsed();
+    return data;
+  }
+
+  // IndexedDB is optional (private windows, old browsers): every failure just
+  // means "not cached".
+  function openDb() {
+    return new Promise(resolve => {
+      try {
+        const req = indexedDB.open(DB_NAME, 1);
+        req.onupgradeneeded = () => req.result.createObjectStore(STORE);
+        req.onsuccess = () => resolve(req.result);
+        req.onerror = () => resolve(null);
+      } catch (e) { resolve(null); }
+    });
+  }
+  async function cached(v) {
+    const done = span('cache');
+    const db = v && await openDb();
+    if (!db) return null;
+    return new Promise(resolve => {
+      try {
+        const req = db.transaction(STORE).objectStore(STORE).get(v.version);
+        req.onsuccess = () => { done(); resolve(req.result || null); };
+        req.onerror = () => resolve(null);
+      } catch (e) { resolve(null); }
+    });
+  }
+  async function store(v, data) {
+    const db = await openDb();
+    if (!db) return;
+    try {
+      const st = db.transaction(STORE, 'readwrite').objectStore(STORE);
+      st.clear();  // only the current version is kept
+      st.put(data, v.version);
+    } catch (e) { console.error(e); }
+  }
+
+  let loading = null;
+  function load() {
+    loading = loading || (async () => {
+      const v = await version();
+      const hit = await cached(v);
+      if (hit) return hit;
+      const data = await fetchDataset(v);
+      if (v) store(v, data);
+      return data;
+    })().catch(e => { loading = null; throw e; });
+    return loading;
+  }
+
+  // Same shape as projects.rollups.json (build_rollups in setup_showcase.py),
+  // computed from a full dataset for builds without the file and for demos.
+  function summarize(data) {
+    const projects = data.projects || [], classes = data.classes || [];
+    const cube = new Map(), perClass = new Map(classes.map(c => [c.name, { projects: 0, students: new Set() }]));
+    for (const p of projects) {
+      const key = JSON.stringify([p.month || '', p.grade || '', p.tool || '']);
+      cube.set(key, (cube.get(key) || 0) + 1);
+      for (const k of new Set([p.klass, ...(p.alsoIn || [])])) {
+        const c = perClass.get(k);
+        if (c) { c.projects++; c.students.add(p.student); }
+      }
+    }
+    const cmp = (a, b) => a < b ? -1 : a > b ? 1 : 0;
+    return {
+      totals: {
+        projects: projects.length,
+        students: new Set(projects.map(p => p.student)).size,
+        classes: classes.length,
+        months: new Set(projects.map(p => p.month).filter(Boolean)).size
+      },
+      columns: ['month', 'grade', 'tool', 'projects'],
+      counts: Array.from(cube, ([key, n]) => [...JSON.parse(key), n]),
+      classes: classes.map(c => ({ name: c.name, grade: c.grade, capacity: c.count,
+        projects: perClass.get(c.name).projects, students: perClass.get(c.name).students.size })),
+      recent: projects.slice().sort((a, b) => cmp(b.date || '', a.date || '') || cmp(a.id, b.id)).slice(0, 6)
+    };
+  }
+  async function rollups() {
+    const v = await version();
+    if (!v?.rollups) return summarize(await load());
+    const done = span('fetch rollups');
+    const r = await fetchJson(v.rollups);
+    done();
+    return r;
+  }
+
+  // Offline support; skipped on the local dev server so edits always show.
+  if (typeof navigator !== 'undefined' && 'serviceWorker' in navigator &&
+      !['localhost', '127.0.0.1'].includes(location.hostname)) {
+    navigator.serviceWorker.register('sw.js').catch(e => console.error(e));
+  }
+
+  globalThis.ShowcaseData = { load, version, cached, fetchJson, withSearchText, decodeCompact, span, rollups, summarize };
+})();